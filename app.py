@@ -1,33 +1,82 @@
 import asyncio
 import json
-from typing import cast
+from argparse import ArgumentParser, Namespace
+from contextlib import suppress
+from multiprocessing import Barrier, Process, synchronize
+from signal import SIGTERM, signal
+from tempfile import TemporaryDirectory
+from typing import Any, Awaitable, Optional, cast
 from uuid import uuid4
 
-import nest_asyncio
 from websockets.server import WebSocketServerProtocol, serve
 
+from paper_tactics.adapters.file_game_repository import FileGameRepository
 from paper_tactics.adapters.in_memory_game_repository import InMemoryGameRepository
 from paper_tactics.adapters.in_memory_match_request_queue import (
     InMemoryMatchRequestQueue,
 )
+from paper_tactics.adapters.process_pool_game_bot import (
+    ProcessPoolGameBot,
+    get_executor,
+)
+from paper_tactics.adapters.sharded_game_repository import (
+    ShardedGameRepository,
+    get_game_repository_handlers,
+    get_shard_index,
+)
+from paper_tactics.adapters.sharded_player_notifier import (
+    ShardedPlayerNotifier,
+    get_player_notifier_handlers,
+    make_player_id,
+)
 from paper_tactics.adapters.stdout_logger import StdoutLogger
-from paper_tactics.adapters.websockets_player_notifier import WebsocketsPlayerNotifier
+from paper_tactics.adapters.unix_socket_rpc import Handlers, RpcClient
+from paper_tactics.adapters.unix_socket_rpc import serve as serve_rpc
+from paper_tactics.adapters.websockets_player_notifier import (
+    WebsocketsAsyncPlayerNotifier,
+)
 from paper_tactics.entities.cell import Cell
+from paper_tactics.entities.game_bot import GameBot
 from paper_tactics.entities.game_preferences import GamePreferences
 from paper_tactics.entities.match_request import MatchRequest
-from paper_tactics.use_cases.concede import concede
-from paper_tactics.use_cases.create_game import create_game
-from paper_tactics.use_cases.make_turn import make_turn
-
-nest_asyncio.apply()
+from paper_tactics.ports.game_repository import GameRepository
+from paper_tactics.ports.player_notifier import AsyncPlayerNotifier
+from paper_tactics.use_cases.concede import concede_async
+from paper_tactics.use_cases.create_game import (
+    create_game_async,
+    create_games_async,
+)
+from paper_tactics.use_cases.make_turn import make_turn_async
 
-game_repository = InMemoryGameRepository()
+game_repository: GameRepository = InMemoryGameRepository()
 match_request_queue = InMemoryMatchRequestQueue()
-player_notifier = WebsocketsPlayerNotifier()
+websockets_player_notifier = WebsocketsAsyncPlayerNotifier()
+player_notifier: AsyncPlayerNotifier = websockets_player_notifier
 logger = StdoutLogger()
+game_bot = GameBot()
+# Requests are queued and paired in bulk on every tick, if set
+match_interval_in_seconds: Optional[float] = None
+# Games are written behind to files on every tick, if set
+file_game_repository: Optional[FileGameRepository] = None
+flush_interval_in_seconds = 1.0
+
+# Sharded mode: every shard process serves websockets and owns the games whose
+# ids hash to it, a coordinator process pairs the players of all shards.
+shard_index: Optional[int] = None
+shards: list[RpcClient] = []
+coordinator: Optional[RpcClient] = None
 
 
 async def handler(websocket: WebSocketServerProtocol) -> None:
+    try:
+        await handle_messages(websocket)
+    finally:
+        player_id = websockets_player_notifier.websockets.inverse.get(websocket)
+        if player_id is not None:
+            await remove_request(player_id)
+
+
+async def handle_messages(websocket: WebSocketServerProtocol) -> None:
     async for message in websocket:
         try:
             event = json.loads(message)
@@ -37,37 +86,284 @@ async def handler(websocket: WebSocketServerProtocol) -> None:
 
         if event.get("action") == "create-game":
             preferences = GamePreferences(**event.get("preferences", {}))
-            request = MatchRequest(uuid4().hex, event.get("view_data", {}), preferences)
-            player_notifier.websockets[request.id] = websocket
-            create_game(
-                game_repository, match_request_queue, player_notifier, logger, request
+            request = MatchRequest(
+                uuid4().hex if shard_index is None else make_player_id(shard_index),
+                event.get("view_data", {}),
+                preferences,
+                event.get("is_view_delta_enabled") is True,
             )
+            websockets_player_notifier.websockets[request.id] = websocket
+            if event.get("view_encoding") == "bitmask":
+                websockets_player_notifier.bitmask_player_ids.add(request.id)
+            await start_game(request)
         elif event.get("action") == "make-turn":
             try:
-                player_id = player_notifier.websockets.inverse[websocket]
+                player_id = websockets_player_notifier.websockets.inverse[websocket]
                 game_id = event["gameId"]
                 cell = cast(Cell, tuple(event["cell"]))
                 assert len(cell) == 2
             except Exception as e:
                 logger.log_exception(e)
                 return
-            make_turn(
-                game_repository, player_notifier, logger, game_id, player_id, cell
-            )
+            await play_turn(game_id, player_id, cell)
         elif event.get("action") == "concede":
             try:
-                player_id = player_notifier.websockets.inverse[websocket]
+                player_id = websockets_player_notifier.websockets.inverse[websocket]
                 game_id = event["gameId"]
             except Exception as e:
                 logger.log_exception(e)
                 return
-            concede(game_repository, player_notifier, logger, game_id, player_id)
+            await leave_game(game_id, player_id)
+
+
+async def start_game(request: MatchRequest) -> None:
+    if coordinator:
+        await coordinator.call_async("start_game", request)
+    elif match_interval_in_seconds is not None:
+        match_request_queue.put(request)
+    else:
+        await create_game_async(
+            game_repository, match_request_queue, player_notifier, logger, request
+        )
+
+
+async def remove_request(player_id: str) -> None:
+    if coordinator:
+        await coordinator.call_async("remove_request", player_id)
+    else:
+        match_request_queue.remove(player_id)
+
+
+async def play_turn(game_id: str, player_id: str, cell: Cell) -> None:
+    shard = get_owning_shard(game_id)
+    if shard:
+        await shard.call_async("play_turn", game_id, player_id, cell)
+    else:
+        await make_turn_async(
+            game_repository, player_notifier, logger, game_id, player_id, cell, game_bot
+        )
+
+
+async def leave_game(game_id: str, player_id: str) -> None:
+    shard = get_owning_shard(game_id)
+    if shard:
+        await shard.call_async("leave_game", game_id, player_id)
+    else:
+        await concede_async(
+            game_repository, player_notifier, logger, game_id, player_id
+        )
+
+
+async def match_requests(interval_in_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_in_seconds)
+        try:
+            await create_games_async(
+                game_repository, match_request_queue, player_notifier, logger
+            )
+        except Exception as e:
+            logger.log_exception(e)
+
+
+async def flush_games(
+    game_repository: FileGameRepository, interval_in_seconds: float
+) -> None:
+    while True:
+        await asyncio.sleep(interval_in_seconds)
+        try:
+            # Syncing to the disk blocks, turns go on meanwhile
+            await asyncio.get_running_loop().run_in_executor(
+                None, game_repository.flush
+            )
+        except Exception as e:
+            logger.log_exception(e)
+
+
+def get_owning_shard(game_id: str) -> Optional[RpcClient]:
+    """Returns the shard to forward the game to, unless it is this one."""
+    if not shards or get_shard_index(game_id, len(shards)) == shard_index:
+        return None
+    return shards[get_shard_index(game_id, len(shards))]
+
+
+def stop_on_sigterm() -> None:
+    """Cancels the running task on SIGTERM, so the pending games are flushed."""
+    task = cast(asyncio.Task, asyncio.current_task())
+    asyncio.get_running_loop().add_signal_handler(SIGTERM, task.cancel)
+
+
+async def main(reuse_port: bool = False) -> None:
+    stop_on_sigterm()
+    tasks: list[Awaitable[Any]] = [asyncio.Future()]
+    if match_interval_in_seconds is not None and coordinator is None:
+        tasks.append(match_requests(match_interval_in_seconds))
+    if file_game_repository:
+        tasks.append(flush_games(file_game_repository, flush_interval_in_seconds))
+    async with serve(handler, "", 8001, reuse_port=reuse_port):
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            if file_game_repository:
+                file_game_repository.flush()
+
+
+async def main_in_shard_process(
+    address: str,
+    handlers: Handlers,
+    barrier: synchronize.Barrier,
+    is_serving_websockets: bool,
+) -> None:
+    stop_on_sigterm()
+    async with await serve_rpc(address, handlers):
+        # Nobody is called before every process is listening
+        barrier.wait()
+        if is_serving_websockets:
+            await main(reuse_port=True)
+        elif match_interval_in_seconds is not None:
+            await match_requests(match_interval_in_seconds)
+        else:
+            await asyncio.Future()
+
+
+def run_shard(
+    index: int,
+    addresses: list[str],
+    coordinator_address: str,
+    barrier: synchronize.Barrier,
+    args: Namespace,
+) -> None:
+    global shard_index, shards, coordinator, player_notifier, game_bot
+    shard_index = index
+    shards = [RpcClient(address) for address in addresses]
+    coordinator = RpcClient(coordinator_address)
+    player_notifier = ShardedPlayerNotifier(shards, index, websockets_player_notifier)
+    game_bot = get_game_bot(args)
+    if args.data_directory:
+        open_game_files(f"{args.data_directory}/shard-{index}", args)
+    handlers: Handlers = {
+        **get_game_repository_handlers(game_repository),
+        **get_player_notifier_handlers(websockets_player_notifier),
+        "play_turn": play_turn,
+        "leave_game": leave_game,
+    }
+    with suppress(asyncio.CancelledError):
+        asyncio.run(main_in_shard_process(addresses[index], handlers, barrier, True))
+
+
+def run_coordinator(
+    addresses: list[str],
+    coordinator_address: str,
+    barrier: synchronize.Barrier,
+    args: Namespace,
+) -> None:
+    global shards, game_repository, match_request_queue, player_notifier
+    global match_interval_in_seconds
+    shards = [RpcClient(address) for address in addresses]
+    game_repository = ShardedGameRepository(shards)
+    match_request_queue = InMemoryMatchRequestQueue(args.match_request_ttl_in_seconds)
+    player_notifier = ShardedPlayerNotifier(shards)
+    match_interval_in_seconds = args.match_interval_in_seconds
+    handlers: Handlers = {
+        "start_game": start_game,
+        "remove_request": remove_request,
+    }
+    with suppress(asyncio.CancelledError):
+        asyncio.run(
+            main_in_shard_process(coordinator_address, handlers, barrier, False)
+        )
+
+
+def run_shards(args: Namespace) -> None:
+    with TemporaryDirectory() as directory:
+        addresses = [f"{directory}/{index}.sock" for index in range(args.shard_count)]
+        coordinator_address = f"{directory}/coordinator.sock"
+        barrier = Barrier(args.shard_count + 1)
+        processes = [
+            Process(
+                target=run_coordinator,
+                args=(addresses, coordinator_address, barrier, args),
+            )
+        ] + [
+            Process(
+                target=run_shard,
+                args=(index, addresses, coordinator_address, barrier, args),
+            )
+            for index in range(args.shard_count)
+        ]
+        for process in processes:
+            process.start()
+
+        # Shard processes share the port, leftovers would keep taking connections
+        def stop(*_: Any) -> None:
+            for process in processes:
+                process.terminate()
+
+        signal(SIGTERM, stop)
+        for process in processes:
+            process.join()
+
+
+def open_game_files(directory: str, args: Namespace) -> None:
+    global game_repository, file_game_repository, flush_interval_in_seconds
+    game_repository = file_game_repository = FileGameRepository(directory)
+    flush_interval_in_seconds = args.flush_interval_in_seconds
 
 
-async def main() -> None:
-    async with serve(handler, "", 8001):
-        await asyncio.Future()
+def get_game_bot(args: Namespace) -> GameBot:
+    if not args.bot_worker_count:
+        return GameBot()
+    get_executor(args.bot_worker_count)
+    return ProcessPoolGameBot(
+        time_budget_in_ms=args.bot_time_budget_in_ms,
+        worker_count=args.bot_worker_count,
+    )
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--bot-worker-count",
+        type=int,
+        default=0,
+        help="search bot turns in this many processes (default: heuristic bot)",
+    )
+    parser.add_argument("--bot-time-budget-in-ms", type=float, default=1000)
+    parser.add_argument(
+        "--match-request-ttl-in-seconds",
+        type=float,
+        help="stop matching requests queued for longer (default: never)",
+    )
+    parser.add_argument(
+        "--match-interval-in-seconds",
+        type=float,
+        help="queue requests and pair them in bulk this often (default: at once)",
+    )
+    parser.add_argument(
+        "--data-directory",
+        help="keep the games in this directory (default: in memory only)",
+    )
+    parser.add_argument(
+        "--flush-interval-in-seconds",
+        type=float,
+        default=1.0,
+        help="write the stored games to the data directory this often",
+    )
+    parser.add_argument(
+        "--shard-count",
+        type=int,
+        default=1,
+        help="serve from this many processes, each owning a part of the games",
+    )
+    args = parser.parse_args()
+    if args.shard_count > 1:
+        run_shards(args)
+    else:
+        match_request_queue = InMemoryMatchRequestQueue(
+            args.match_request_ttl_in_seconds
+        )
+        game_bot = get_game_bot(args)
+        match_interval_in_seconds = args.match_interval_in_seconds
+        if args.data_directory:
+            open_game_files(args.data_directory, args)
+        with suppress(asyncio.CancelledError):
+            asyncio.run(main())
@@ -1,24 +1,21 @@
+import asyncio
 import json
 from typing import Any
 
+from game_storage import get_game_repository
 from paper_tactics.adapters.aws_api_gateway_player_notifier import (
-    AwsApiGatewayPlayerNotifier,
+    AwsApiGatewayAsyncPlayerNotifier,
 )
-from paper_tactics.adapters.dynamodb_game_repository import DynamodbGameRepository
+from paper_tactics.adapters.caching_game_repository import CachingGameRepository
 from paper_tactics.adapters.stdout_logger import StdoutLogger
-from paper_tactics.use_cases.concede import concede
+from paper_tactics.use_cases.concede import concede_async
 
-game_repository = DynamodbGameRepository(
-    "paper-tactics-game-states",
-    "id",
-    "expiration-time",
-    600,
-)
+game_repository = CachingGameRepository(get_game_repository(is_read_consistent=False))
 logger = StdoutLogger()
 
 
 def handler(event: dict[str, Any], context: Any) -> dict[str, int]:
-    player_notifier = AwsApiGatewayPlayerNotifier(
+    player_notifier = AwsApiGatewayAsyncPlayerNotifier(
         "https://"
         + event["requestContext"]["domainName"]
         + "/"
@@ -33,5 +30,7 @@ def handler(event: dict[str, Any], context: Any) -> dict[str, int]:
         logger.log_exception(e)
         return {"statusCode": 400}
 
-    concede(game_repository, player_notifier, logger, game_id, player_id)
+    asyncio.run(
+        concede_async(game_repository, player_notifier, logger, game_id, player_id)
+    )
     return {"statusCode": 200}
@@ -1,17 +1,18 @@
+import asyncio
 import json
 from typing import Any
 
+from game_storage import get_game_repository
 from paper_tactics.adapters.aws_api_gateway_player_notifier import (
-    AwsApiGatewayPlayerNotifier,
+    AwsApiGatewayAsyncPlayerNotifier,
 )
-from paper_tactics.adapters.dynamodb_game_repository import DynamodbGameRepository
 from paper_tactics.adapters.dynamodb_match_request_queue import (
     DynamodbMatchRequestQueue,
 )
 from paper_tactics.adapters.stdout_logger import StdoutLogger
 from paper_tactics.entities.game_preferences import GamePreferences
 from paper_tactics.entities.match_request import MatchRequest
-from paper_tactics.use_cases.create_game import create_game
+from paper_tactics.use_cases.create_game import create_game_async
 
 player_queue = DynamodbMatchRequestQueue(
     "paper-tactics-client-queue",
@@ -19,12 +20,7 @@ player_queue = DynamodbMatchRequestQueue(
     "expiration-time",
     3600,
 )
-game_repository = DynamodbGameRepository(
-    "paper-tactics-game-states",
-    "id",
-    "expiration-time",
-    600,
-)
+game_repository = get_game_repository()
 logger = StdoutLogger()
 
 
@@ -33,7 +29,7 @@ class ApiAbuseException(Exception):
 
 
 def handler(event: dict[str, Any], context: Any) -> dict[str, int]:
-    player_notifier = AwsApiGatewayPlayerNotifier(
+    player_notifier = AwsApiGatewayAsyncPlayerNotifier(
         "https://"
         + event["requestContext"]["domainName"]
         + "/"
@@ -48,11 +44,16 @@ def handler(event: dict[str, Any], context: Any) -> dict[str, int]:
             event["requestContext"]["connectionId"],
             body.get("view_data", {}),
             GamePreferences(**body.get("preferences", {})),
+            body.get("is_view_delta_enabled") is True,
         )
     except Exception as e:
         logger.log_exception(e)
         return {"statusCode": 400}
 
-    create_game(game_repository, player_queue, player_notifier, logger, request)
+    asyncio.run(
+        create_game_async(
+            game_repository, player_queue, player_notifier, logger, request
+        )
+    )
 
     return {"statusCode": 200}
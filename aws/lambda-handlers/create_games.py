@@ -0,0 +1,30 @@
+import asyncio
+import os
+from typing import Any
+
+from game_storage import get_game_repository
+from paper_tactics.adapters.aws_api_gateway_player_notifier import (
+    AwsApiGatewayAsyncPlayerNotifier,
+)
+from paper_tactics.adapters.dynamodb_match_request_queue import (
+    DynamodbMatchRequestQueue,
+)
+from paper_tactics.adapters.stdout_logger import StdoutLogger
+from paper_tactics.use_cases.create_game import create_games_async
+
+player_queue = DynamodbMatchRequestQueue(
+    "paper-tactics-client-queue",
+    "connection-id",
+    "expiration-time",
+    3600,
+)
+game_repository = get_game_repository()
+logger = StdoutLogger()
+
+
+def handler(event: dict[str, Any], context: Any) -> None:
+    # Scheduled events come without a request context to find the API by
+    player_notifier = AwsApiGatewayAsyncPlayerNotifier(os.environ["API_ENDPOINT_URL"])
+    asyncio.run(
+        create_games_async(game_repository, player_queue, player_notifier, logger)
+    )
@@ -0,0 +1,32 @@
+import os
+
+from paper_tactics.adapters.dynamodb_game_repository import DynamodbGameRepository
+from paper_tactics.adapters.dynamodb_turn_log_game_repository import (
+    DynamodbTurnLogGameRepository,
+)
+from paper_tactics.ports.game_repository import GameRepository
+
+
+def get_game_repository(is_read_consistent: bool = True) -> GameRepository:
+    """Returns the repository the GAME_STORAGE template parameter chose.
+
+    The turn log reads the games it does not have yet from the game states,
+    so the games being played carry on once it is switched to.
+    """
+    game_states = DynamodbGameRepository(
+        "paper-tactics-game-states",
+        "id",
+        "expiration-time",
+        600,
+        is_read_consistent=is_read_consistent,
+    )
+    if os.environ.get("GAME_STORAGE") != "turn-log":
+        return game_states
+    return DynamodbTurnLogGameRepository(
+        "paper-tactics-game-turns",
+        "id",
+        "expiration-time",
+        600,
+        is_read_consistent=is_read_consistent,
+        legacy_game_repository=game_states,
+    )
@@ -1,25 +1,26 @@
+import asyncio
 import json
+from time import monotonic
 from typing import Any, cast
 
+from game_storage import get_game_repository
 from paper_tactics.adapters.aws_api_gateway_player_notifier import (
-    AwsApiGatewayPlayerNotifier,
+    AwsApiGatewayAsyncPlayerNotifier,
 )
-from paper_tactics.adapters.dynamodb_game_repository import DynamodbGameRepository
+from paper_tactics.adapters.caching_game_repository import CachingGameRepository
 from paper_tactics.adapters.stdout_logger import StdoutLogger
 from paper_tactics.entities.cell import Cell
-from paper_tactics.use_cases.make_turn import make_turn
+from paper_tactics.entities.tree_search_game_bot import TreeSearchGameBot
+from paper_tactics.use_cases.make_turn import make_turn_async
 
-game_repository = DynamodbGameRepository(
-    "paper-tactics-game-states",
-    "id",
-    "expiration-time",
-    600,
-)
+# Warm containers often handle the following turns of the same game
+game_repository = CachingGameRepository(get_game_repository(is_read_consistent=False))
 logger = StdoutLogger()
+bot_time_budget_in_ms = 1000
 
 
 def handler(event: dict[str, Any], context: Any) -> dict[str, int]:
-    player_notifier = AwsApiGatewayPlayerNotifier(
+    player_notifier = AwsApiGatewayAsyncPlayerNotifier(
         "https://"
         + event["requestContext"]["domainName"]
         + "/"
@@ -36,5 +37,15 @@ def handler(event: dict[str, Any], context: Any) -> dict[str, int]:
         logger.log_exception(e)
         return {"statusCode": 400}
 
-    make_turn(game_repository, player_notifier, logger, game_id, player_id, cell)
+    remaining_time_in_ms = context.get_remaining_time_in_millis()
+    game_bot = TreeSearchGameBot(
+        time_budget_in_ms=min(bot_time_budget_in_ms, remaining_time_in_ms / 3),
+        # Turns retried on stale games search again, but all in the same time
+        deadline=monotonic() + remaining_time_in_ms / 1000 / 3,
+    )
+    asyncio.run(
+        make_turn_async(
+            game_repository, player_notifier, logger, game_id, player_id, cell, game_bot
+        )
+    )
     return {"statusCode": 200}
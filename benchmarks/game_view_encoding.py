@@ -0,0 +1,95 @@
+"""Times encoding game views the way the notifiers do and prints JSON.
+
+Run with `python -m benchmarks.game_view_encoding --help`.
+"""
+
+import json
+import random
+import sys
+from argparse import ArgumentParser
+from dataclasses import asdict
+from time import perf_counter
+from typing import Any, Callable, Union
+
+from paper_tactics.adapters.game_view_encoder import encode_bitmask, encode_json
+from paper_tactics.entities.game import Game
+from paper_tactics.entities.game_bot import GameBot
+from paper_tactics.entities.game_preferences import GamePreferences
+from paper_tactics.entities.game_view import GameView
+from paper_tactics.entities.game_view_delta import GameViewDelta
+from paper_tactics.entities.player import Player
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--game-count", type=int, default=20)
+    parser.add_argument("--size", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    views, deltas = _collect_views(GamePreferences(size=args.size), args.game_count)
+    encoders: dict[str, Callable[[Any], Union[str, bytes]]] = {
+        "asdict_json": lambda view: json.dumps(asdict(view), default=list),
+        "json": encode_json,
+        "bitmask": encode_bitmask,
+    }
+
+    results = []
+    for kind, samples in ("view", views), ("delta", deltas):
+        for name, encode in encoders.items():
+            best_time = min(_time(encode, samples) for _ in range(args.repeat))
+            results.append(
+                {
+                    "kind": kind,
+                    "encoder": name,
+                    "views": len(samples),
+                    "views_per_second": len(samples) / best_time,
+                    "mean_size_in_bytes": sum(len(encode(sample)) for sample in samples)
+                    / len(samples),
+                }
+            )
+
+    json.dump(
+        {"arguments": vars(args), "python": sys.version, "results": results},
+        sys.stdout,
+        indent=2,
+    )
+    print()
+
+
+def _collect_views(
+    preferences: GamePreferences, game_count: int
+) -> tuple[list[GameView], list[GameViewDelta]]:
+    game_bot = GameBot()
+    views = []
+    deltas = []
+    for _ in range(game_count):
+        game = Game(
+            preferences=preferences,
+            active_player=Player("a", is_view_delta_enabled=True),
+            passive_player=Player("b", is_view_delta_enabled=True),
+        )
+        game.init()
+        while game.active_player.can_win and game.passive_player.can_win:
+            for player_id in game.active_player.id, game.passive_player.id:
+                view_update = game.get_view_update(player_id)
+                if isinstance(view_update, GameViewDelta):
+                    deltas.append(view_update)
+                views.append(game.get_view(player_id))
+                game.acknowledge_view(player_id)
+            player_id = game.active_player.id
+            game.make_turn(player_id, game_bot.make_turn(game.get_view(player_id)))
+    return views, deltas
+
+
+def _time(encode: Callable[[Any], Union[str, bytes]], samples: list[Any]) -> float:
+    start_time = perf_counter()
+    for sample in samples:
+        encode(sample)
+    return perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Plays bot against bot games over a grid of preferences and prints JSON.
+
+Games and turns per second include choosing the moves, turn latencies only
+cover Game.make_turn. Run with `python -m benchmarks.self_play --help`.
+"""
+
+import json
+import random
+import resource
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from dataclasses import asdict
+from itertools import product
+from time import perf_counter
+from typing import Any
+
+from paper_tactics.entities.game import Game
+from paper_tactics.entities.game_bot import GameBot
+from paper_tactics.entities.game_preferences import GamePreferences
+from paper_tactics.entities.player import Player
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--game-count", type=int, default=100, help="per preferences")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[6, 12])
+    parser.add_argument("--turn-counts", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--visibility", type=int, nargs="+", default=[0, 1])
+    parser.add_argument(
+        "--trench-density-percents", type=int, nargs="+", default=[0, 20]
+    )
+    parser.add_argument("--double-base", type=int, nargs="+", default=[0, 1])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="report peak traced memory per preferences (slows everything down)",
+    )
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    results = []
+    for size, turn_count, visibility, density, double_base in product(
+        args.sizes,
+        args.turn_counts,
+        args.visibility,
+        args.trench_density_percents,
+        args.double_base,
+    ):
+        preferences = GamePreferences(
+            size=size,
+            turn_count=turn_count,
+            is_visibility_applied=bool(visibility),
+            trench_density_percent=density,
+            is_double_base=bool(double_base),
+        )
+        results.append(_run(preferences, args.game_count, args.trace_memory))
+
+    report = {
+        "arguments": vars(args),
+        "python": sys.version,
+        "max_rss_in_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+def _run(preferences: GamePreferences, game_count: int, trace_memory: bool) -> Any:
+    game_bot = GameBot()
+    latencies = []
+    if trace_memory:
+        tracemalloc.start()
+    start_time = perf_counter()
+
+    for _ in range(game_count):
+        game = Game(
+            preferences=preferences,
+            active_player=Player("a"),
+            passive_player=Player("b"),
+        )
+        game.init()
+        while game.active_player.can_win and game.passive_player.can_win:
+            player_id = game.active_player.id
+            cell = game_bot.make_turn(game.get_view(player_id))
+            turn_start_time = perf_counter()
+            game.make_turn(player_id, cell)
+            latencies.append(perf_counter() - turn_start_time)
+
+    elapsed_time = perf_counter() - start_time
+    peak_memory = None
+    if trace_memory:
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    latencies.sort()
+
+    return {
+        "preferences": asdict(preferences),
+        "games": game_count,
+        "turns": len(latencies),
+        "games_per_second": game_count / elapsed_time,
+        "turns_per_second": len(latencies) / elapsed_time,
+        "p50_turn_latency_in_ms": _get_percentile(latencies, 0.5) * 1000,
+        "p99_turn_latency_in_ms": _get_percentile(latencies, 0.99) * 1000,
+        "peak_traced_memory_in_bytes": peak_memory,
+    }
+
+
+def _get_percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0
+    return sorted_values[round(fraction * (len(sorted_values) - 1))]
+
+
+if __name__ == "__main__":
+    main()
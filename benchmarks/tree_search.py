@@ -0,0 +1,83 @@
+"""Measures playouts per second of TreeSearchGameBot and prints JSON.
+
+Run with `python -m benchmarks.tree_search --help`.
+"""
+
+import json
+import sys
+from argparse import ArgumentParser
+from random import Random
+from time import perf_counter
+
+from paper_tactics.entities.game import Game
+from paper_tactics.entities.game_preferences import GamePreferences
+from paper_tactics.entities.player import Player
+from paper_tactics.entities.tree_search_game_bot import TreeSearchGameBot
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--turn-count", type=int, default=3)
+    parser.add_argument("--trench-density-percent", type=int, default=0)
+    parser.add_argument("--opening-move-count", type=int, default=30)
+    parser.add_argument("--position-count", type=int, default=10)
+    parser.add_argument("--time-budget-in-ms", type=float, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    preferences = GamePreferences(
+        size=args.size,
+        turn_count=args.turn_count,
+        trench_density_percent=args.trench_density_percent,
+    )
+    game_bot = TreeSearchGameBot(
+        time_budget_in_ms=args.time_budget_in_ms * args.turn_count,
+        playout_budget=10**9,
+    )
+    random = Random(args.seed)
+    playout_count = 0
+    elapsed_time = 0.0
+
+    for _ in range(args.position_count):
+        game = _play_opening(preferences, args.opening_move_count, random)
+        start_time = perf_counter()
+        statistics = game_bot.search(game.get_view(game.active_player.id))
+        elapsed_time += perf_counter() - start_time
+        playout_count += sum(visit_count for visit_count, _ in statistics.values())
+
+    json.dump(
+        {
+            "arguments": vars(args),
+            "python": sys.version,
+            "positions": args.position_count,
+            "playouts": playout_count,
+            "playouts_per_second": playout_count / elapsed_time,
+        },
+        sys.stdout,
+        indent=2,
+    )
+    print()
+
+
+def _play_opening(
+    preferences: GamePreferences, move_count: int, random: Random
+) -> Game:
+    while True:
+        game = Game(
+            preferences=preferences,
+            active_player=Player("a"),
+            passive_player=Player("b"),
+        )
+        game.init()
+        for _ in range(move_count):
+            if not game.active_player.can_win or not game.passive_player.can_win:
+                break
+            cell = random.choice(sorted(game.active_player.reachable))
+            game.make_turn(game.active_player.id, cell)
+        else:
+            return game
+
+
+if __name__ == "__main__":
+    main()
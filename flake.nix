@@ -5,7 +5,7 @@
       disableTests = _: { doCheck = false; };
       getPythonPkgs = pythonPkgs: builtins.attrValues {
         inherit (pythonPkgs)
-          websockets nest-asyncio pytest docker
+          websockets pytest docker
           pytest-testmon hypothesis coverage boto3;
         moto = pythonPkgs.moto.overridePythonAttrs disableTests;
         bidict = pythonPkgs.bidict.overridePythonAttrs disableTests;
@@ -1,23 +1,75 @@
-from dataclasses import asdict
-import json
+import asyncio
+from threading import Lock
+from typing import Any, Final, Union
 
 import boto3
+from botocore.config import Config
 
+from paper_tactics.adapters.game_view_encoder import encode_json
 from paper_tactics.entities.game_view import GameView
-from paper_tactics.ports.player_notifier import PlayerGoneException, PlayerNotifier
+from paper_tactics.entities.game_view_delta import GameViewDelta
+from paper_tactics.ports.player_notifier import (
+    AsyncPlayerNotifier,
+    PlayerGoneException,
+    PlayerNotifier,
+)
+
+MAX_POOL_CONNECTIONS: Final = 10
+
+_clients: dict[tuple[str, int], Any] = {}
+_clients_lock = Lock()
+
+
+def get_client(
+    endpoint_url: str, max_pool_connections: int = MAX_POOL_CONNECTIONS
+) -> Any:
+    """Returns the client of the endpoint, shared by the whole process.
+
+    Clients keep their connections alive, so warm Lambda containers skip
+    both client construction and TLS handshakes.
+    """
+    with _clients_lock:
+        key = endpoint_url, max_pool_connections
+        if key not in _clients:
+            _clients[key] = boto3.client(
+                "apigatewaymanagementapi",
+                endpoint_url=endpoint_url,
+                config=Config(
+                    max_pool_connections=max_pool_connections, tcp_keepalive=True
+                ),
+            )
+        return _clients[key]
 
 
 class AwsApiGatewayPlayerNotifier(PlayerNotifier):
-    def __init__(self, endpoint_url: str):
-        self._client = boto3.client(
-            "apigatewaymanagementapi", endpoint_url=endpoint_url
-        )
+    def __init__(
+        self, endpoint_url: str, max_pool_connections: int = MAX_POOL_CONNECTIONS
+    ):
+        self._client = get_client(endpoint_url, max_pool_connections)
 
-    def notify(self, player_id: str, game_view: GameView) -> None:
+    def notify(self, player_id: str, game_view: Union[GameView, GameViewDelta]) -> None:
         try:
             self._client.post_to_connection(
-                Data=json.dumps(asdict(game_view), default=list),
+                Data=encode_json(game_view),
                 ConnectionId=player_id,
             )
         except self._client.exceptions.GoneException:
             raise PlayerGoneException(player_id)
+
+
+class AwsApiGatewayAsyncPlayerNotifier(AsyncPlayerNotifier):
+    """Posts from the threads of the default executor of the running loop."""
+
+    def __init__(
+        self, endpoint_url: str, max_pool_connections: int = MAX_POOL_CONNECTIONS
+    ):
+        self._player_notifier = AwsApiGatewayPlayerNotifier(
+            endpoint_url, max_pool_connections
+        )
+
+    async def notify(
+        self, player_id: str, game_view: Union[GameView, GameViewDelta]
+    ) -> None:
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._player_notifier.notify, player_id, game_view
+        )
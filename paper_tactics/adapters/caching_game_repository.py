@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from typing import Sequence
+
+from paper_tactics.entities.game import Game
+from paper_tactics.ports.game_repository import (
+    GameRepository,
+    NoSuchGameException,
+    StaleGameException,
+)
+
+
+class CachingGameRepository(GameRepository):
+    """Keeps the recently used games of another repository.
+
+    Cached games are fetched without asking the other repository, so they may
+    be behind it. Storing a game that is behind fails and forgets it, as does
+    fetching the version of a game that is behind. Whatever was done to a game
+    that is behind is wasted, the search of a bot included, and update_game
+    does it again in the stored game.
+    """
+
+    def __init__(self, game_repository: GameRepository, max_size: int = 128):
+        self._game_repository = game_repository
+        self._max_size = max_size
+        self._games: OrderedDict[str, Game] = OrderedDict()
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def store(self, game: Game) -> None:
+        try:
+            self._game_repository.store(game)
+        except StaleGameException:
+            self._games.pop(game.id, None)
+            raise
+        self._remember(game)
+
+    def store_many(self, games: Sequence[Game]) -> None:
+        self._game_repository.store_many(games)
+        for game in games:
+            self._remember(game)
+
+    def fetch(self, game_id: str) -> Game:
+        if game_id in self._games:
+            self.hit_count += 1
+            self._games.move_to_end(game_id)
+            return self._games[game_id].clone()
+
+        self.miss_count += 1
+        game = self._game_repository.fetch(game_id)
+        self._remember(game)
+        return game
+
+    def fetch_version(self, game_id: str) -> int:
+        """Forgets the cached game unless it has the version returned."""
+        try:
+            version = self._game_repository.fetch_version(game_id)
+        except NoSuchGameException:
+            self._games.pop(game_id, None)
+            raise
+        if game_id in self._games and self._games[game_id].version != version:
+            del self._games[game_id]
+        return version
+
+    def _remember(self, game: Game) -> None:
+        self._games[game.id] = game.clone()
+        self._games.move_to_end(game.id)
+        if len(self._games) > self._max_size:
+            self._games.popitem(last=False)
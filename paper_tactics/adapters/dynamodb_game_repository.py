@@ -1,38 +1,83 @@
-from dataclasses import asdict
-from typing import Any, Iterable
+from typing import Any, Iterable, Sequence
 
-import boto3
+from boto3.dynamodb.conditions import Attr
 
 from paper_tactics.adapters.dynamodb_storage import DynamodbStorage
+from paper_tactics.adapters.game_codec import decode_game, encode_game
+from paper_tactics.entities.bitboard import from_cells
 from paper_tactics.entities.cell import Cell
 from paper_tactics.entities.game import Game
 from paper_tactics.entities.game_preferences import GamePreferences
 from paper_tactics.entities.player import Player
-from paper_tactics.ports.game_repository import GameRepository, NoSuchGameException
+from paper_tactics.ports.game_repository import (
+    GameRepository,
+    NoSuchGameException,
+    StaleGameException,
+)
 
 
 class DynamodbGameRepository(GameRepository, DynamodbStorage):
+    """Games read eventually consistently are read again consistently if they
+    turn out to be missing or stale."""
+
+    def __init__(
+        self,
+        table_name: str,
+        key: str,
+        ttl_key: str,
+        ttl_in_seconds: int,
+        is_read_consistent: bool = True,
+    ):
+        DynamodbStorage.__init__(self, table_name, key, ttl_key, ttl_in_seconds)
+        self._is_read_consistent = is_read_consistent
+        self._stale_game_ids: set[str] = set()
+
     def store(self, game: Game) -> None:
-        serialized_game: dict[str, Any] = {
-            self._key: game.id,
-            "turns-left": game.turns_left,
-            "active-player": self._serialize_player(game.active_player),
-            "passive-player": self._serialize_player(game.passive_player),
-            "preferences": asdict(game.preferences),
-            "trenches": list(game.trenches),
-            self._ttl_key: self.get_expiration_time(),
-        }
+        condition = Attr("version").eq(game.version)
+        if not game.version:
+            condition |= Attr("version").not_exists()
+        try:
+            self._table.put_item(
+                Item={
+                    self._key: game.id,
+                    "game": encode_game(game),
+                    "version": game.version + 1,
+                    self._ttl_key: self.get_expiration_time(),
+                },
+                ConditionExpression=condition,
+            )
+        except self._table.meta.client.exceptions.ConditionalCheckFailedException:
+            self._stale_game_ids.add(game.id)
+            raise StaleGameException(game.id)
+        game.version += 1
+        game.turns.clear()
 
-        self._table.put_item(Item=serialized_game)
+    def store_many(self, games: Sequence[Game]) -> None:
+        # Batch writes cannot be conditional, but nobody else has the new games
+        with self._table.batch_writer() as batch:
+            for game in games:
+                batch.put_item(
+                    Item={
+                        self._key: game.id,
+                        "game": encode_game(game),
+                        "version": game.version + 1,
+                        self._ttl_key: self.get_expiration_time(),
+                    }
+                )
+        for game in games:
+            game.version += 1
+            game.turns.clear()
 
     def fetch(self, game_id: str) -> Game:
-        try:
-            serialized_game: dict[str, Any] = self._table.get_item(
-                Key={self._key: game_id}, ConsistentRead=True
-            )["Item"]
-        except KeyError:
-            raise NoSuchGameException(game_id)
+        serialized_game = self._get_item(game_id)
+        self._stale_game_ids.discard(game_id)
 
+        if "game" in serialized_game:
+            game = decode_game(bytes(serialized_game["game"]))
+            game.version = int(serialized_game["version"])
+            return game
+
+        # Games stored before the binary format have an attribute per field
         return Game(
             id=serialized_game[self._key],
             turns_left=int(serialized_game["turns-left"]),
@@ -48,36 +93,46 @@ class DynamodbGameRepository(GameRepository, DynamodbStorage):
                     for key, value in serialized_game["preferences"].items()
                 }
             ),
-            trenches=frozenset(
-                (int(x), int(y)) for x, y in serialized_game["trenches"]
-            ),
+            trench_mask=self._deserialize_cells(serialized_game["trenches"]),
         )
 
-    def _serialize_player(self, player: Player) -> dict[str, Any]:
-        return {
-            "id": player.id,
-            "units": list(player.units),
-            "walls": list(player.walls),
-            "reachable": list(player.reachable),
-            "visible_opponent": list(player.visible_opponent),
-            "visible_terrain": list(player.visible_terrain),
-            "is_gone": player.is_gone,
-            "is_defeated": player.is_defeated,
-            "view_data": player.view_data,
-        }
+    def fetch_version(self, game_id: str) -> int:
+        return int(self._get_item(game_id, "version").get("version", 0))
+
+    def _get_item(self, game_id: str, *attribute_names: str) -> dict[str, Any]:
+        arguments: dict[str, Any] = {"Key": {self._key: game_id}}
+        if attribute_names:
+            names = {
+                f"#{i}": name for i, name in enumerate((self._key, *attribute_names))
+            }
+            arguments["ProjectionExpression"] = ", ".join(names)
+            arguments["ExpressionAttributeNames"] = names
+        is_read_consistent = self._is_read_consistent or game_id in self._stale_game_ids
+        response = self._table.get_item(**arguments, ConsistentRead=is_read_consistent)
+        if "Item" not in response and not is_read_consistent:
+            response = self._table.get_item(**arguments, ConsistentRead=True)
+        if "Item" not in response:
+            raise NoSuchGameException(game_id)
+        return response["Item"]
 
     def _deserialize_player(self, source: dict[str, Any]) -> Player:
         return Player(
             id=source["id"],
-            units=self._deserialize_cells(source["units"]),
-            walls=self._deserialize_cells(source["walls"]),
-            reachable=self._deserialize_cells(source["reachable"]),
-            visible_opponent=self._deserialize_cells(source["visible_opponent"]),
-            visible_terrain=self._deserialize_cells(source["visible_terrain"]),
+            unit_mask=self._deserialize_cells(source["units"]),
+            wall_mask=self._deserialize_cells(source["walls"]),
+            reachable_mask=self._deserialize_cells(source["reachable"]),
+            visible_opponent_mask=self._deserialize_cells(source["visible_opponent"]),
+            visible_terrain_mask=self._deserialize_cells(source["visible_terrain"]),
             is_gone=source["is_gone"],
             is_defeated=source["is_defeated"],
             view_data=source["view_data"],
+            is_view_delta_enabled=source.get("is_view_delta_enabled", False),
+            view_version=int(source.get("view_version", 0)),
+            acknowledged_view_masks=tuple(
+                self._deserialize_cells(cells)
+                for cells in source.get("acknowledged_view", [])
+            ),
         )
 
-    def _deserialize_cells(self, cells: Iterable[Cell]) -> set[Cell]:
-        return set((int(x), int(y)) for x, y in cells)
+    def _deserialize_cells(self, cells: Iterable[Cell]) -> int:
+        return from_cells((int(x), int(y)) for x, y in cells)
@@ -1,5 +1,10 @@
+import json
 from dataclasses import asdict
-from typing import Any, Optional, cast
+from decimal import Decimal
+from hashlib import sha256
+from typing import Any, Final, Iterator, Optional, cast
+
+from boto3.dynamodb.conditions import Attr, Key
 
 from paper_tactics.adapters.dynamodb_storage import DynamodbStorage
 from paper_tactics.entities.game_preferences import GamePreferences
@@ -8,40 +13,143 @@ from paper_tactics.ports.match_request_queue import MatchRequestQueue
 
 
 class DynamodbMatchRequestQueue(MatchRequestQueue, DynamodbStorage):
+    """Requests are indexed by preferences, oldest first.
+
+    The table needs a global secondary index named INDEX_NAME with
+    PREFERENCES_KEY as its hash key and the TTL attribute as its range key.
+    """
+
+    INDEX_NAME: Final = "game-preferences"
+    PREFERENCES_KEY: Final = "game_preferences_key"
+    PAGE_SIZE: Final = 10
+
     def put(self, request: MatchRequest) -> None:
         self._table.put_item(
             Item={
                 self._key: request.id,
                 self._ttl_key: self.get_expiration_time(),
+                self.PREFERENCES_KEY: get_preferences_key(request.game_preferences),
                 "view_data": request.view_data,
+                "is_view_delta_enabled": request.is_view_delta_enabled,
                 "game_preferences": asdict(request.game_preferences),
             }
         )
 
     def pop(self, game_preferences: GamePreferences) -> Optional[MatchRequest]:
-        queue = self._table.scan(ConsistentRead=True)
-
-        for i in range(queue["Count"]):
-            item = queue["Items"][i]
-            queued_preferences = self._parse_preferences(item["game_preferences"])
-            if queued_preferences == game_preferences:
-                self._table.delete_item(Key={self._key: item[self._key]})
-                return MatchRequest(
-                    cast(str, item[self._key]),
-                    cast(dict[str, str], item["view_data"]),
-                    game_preferences,
-                )
+        for request_id in self._get_request_ids(game_preferences):
+            item = self._take(request_id)
+            if item is not None:
+                return self._deserialize_request(item, game_preferences)
 
         return None
 
-    def _parse_preferences(self, item: Any) -> GamePreferences:
-        return GamePreferences(
-            **{
-                key: value
-                if isinstance(value, bool)
-                else str(value)
-                if isinstance(value, str)
-                else int(value)
-                for key, value in item.items()
-            }
+    def pop_many(self, max_count: int) -> list[MatchRequest]:
+        """Pops the requests found by a scan of the table, in no particular order.
+
+        Requests queued with only the key of their preferences are popped with
+        the preferences of a request of the same key, otherwise left for pop.
+        """
+        requests: list[MatchRequest] = []
+        preferences_by_key: dict[str, GamePreferences] = {}
+        # Ids and preferences keys of the requests queued without preferences
+        keyed_request_ids: list[tuple[str, str]] = []
+        scan: dict[str, Any] = {
+            "ProjectionExpression": "#key, #preferences_key, game_preferences",
+            "ExpressionAttributeNames": {
+                "#key": self._key,
+                "#preferences_key": self.PREFERENCES_KEY,
+            },
+            "FilterExpression": Attr(self.PREFERENCES_KEY).exists(),
+        }
+        while len(requests) < max_count:
+            page = self._table.scan(**scan, Limit=max_count - len(requests))
+            for item in page["Items"]:
+                request_id = cast(str, item[self._key])
+                preferences_key = cast(str, item[self.PREFERENCES_KEY])
+                if "game_preferences" not in item:
+                    keyed_request_ids.append((request_id, preferences_key))
+                    continue
+                preferences = _deserialize_preferences(item["game_preferences"])
+                preferences_by_key[preferences_key] = preferences
+                taken_item = self._take(request_id)
+                if taken_item is not None:
+                    requests.append(self._deserialize_request(taken_item, preferences))
+            if "LastEvaluatedKey" not in page:
+                break
+            scan["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+        for request_id, preferences_key in keyed_request_ids:
+            if len(requests) >= max_count:
+                break
+            if preferences_key not in preferences_by_key:
+                continue
+            taken_item = self._take(request_id)
+            if taken_item is not None:
+                requests.append(
+                    self._deserialize_request(
+                        taken_item, preferences_by_key[preferences_key]
+                    )
+                )
+        return requests
+
+    def _take(self, request_id: str) -> Optional[dict[str, Any]]:
+        # Concurrent pops may race for the same request, only one of the
+        # deletes succeeds and the others move on to the next request.
+        try:
+            return self._table.delete_item(
+                Key={self._key: request_id},
+                ConditionExpression=Attr(self.PREFERENCES_KEY).exists(),
+                ReturnValues="ALL_OLD",
+            )["Attributes"]
+        except self._table.meta.client.exceptions.ConditionalCheckFailedException:
+            return None
+
+    def _deserialize_request(
+        self, item: dict[str, Any], game_preferences: GamePreferences
+    ) -> MatchRequest:
+        return MatchRequest(
+            cast(str, item[self._key]),
+            cast(dict[str, str], item["view_data"]),
+            game_preferences,
+            item.get("is_view_delta_enabled", False),
         )
+
+    def _get_request_ids(self, game_preferences: GamePreferences) -> Iterator[str]:
+        """Yields queued request ids, oldest first, a page at a time.
+
+        The index is eventually consistent, so the requests may already be
+        taken.
+        """
+        query: dict[str, Any] = {
+            "IndexName": self.INDEX_NAME,
+            "KeyConditionExpression": Key(self.PREFERENCES_KEY).eq(
+                get_preferences_key(game_preferences)
+            ),
+            "ProjectionExpression": "#key",
+            "ExpressionAttributeNames": {"#key": self._key},
+            "Limit": self.PAGE_SIZE,
+        }
+        while True:
+            page = self._table.query(**query)
+            for item in page["Items"]:
+                yield cast(str, item[self._key])
+            if "LastEvaluatedKey" not in page:
+                return
+            query["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+
+def get_preferences_key(game_preferences: GamePreferences) -> str:
+    """Returns the same short key for all equal preferences."""
+    return sha256(
+        json.dumps(asdict(game_preferences), sort_keys=True).encode()
+    ).hexdigest()
+
+
+def _deserialize_preferences(source: dict[str, Any]) -> GamePreferences:
+    # Numbers are read back as decimals
+    return GamePreferences(
+        **{
+            key: int(value) if isinstance(value, Decimal) else value
+            for key, value in source.items()
+        }
+    )
@@ -0,0 +1,201 @@
+from collections import OrderedDict
+from time import time
+from typing import Any, Final, Iterator, Optional, Sequence
+
+from boto3.dynamodb.conditions import Attr, Key
+
+from paper_tactics.adapters.dynamodb_storage import DynamodbStorage
+from paper_tactics.adapters.game_codec import decode_game, encode_game
+from paper_tactics.adapters.turn_log_codec import encode_events, replay_events
+from paper_tactics.entities.game import Game
+from paper_tactics.ports.game_repository import (
+    GameRepository,
+    NoSuchGameException,
+    StaleGameException,
+)
+
+
+class DynamodbTurnLogGameRepository(GameRepository, DynamodbStorage):
+    """Appends what has happened to a game instead of rewriting the game.
+
+    Every store adds an item keyed by the version it stores, holding the turns
+    made, the players who left and the views received since the game was
+    fetched. The game is checkpointed whole instead if it cannot be replayed
+    from them, if its version is a multiple of checkpoint_interval, or if its
+    checkpoint would expire before a new item. A fetch thus replays at most
+    checkpoint_interval items. Checkpoints expire after twice the TTL, and
+    the items replayed onto them expire with them.
+
+    Games missing from the table are fetched from legacy_game_repository, if
+    given, and checkpointed here when they are next stored.
+
+    The table needs VERSION_KEY as its range key. Games read eventually
+    consistently are read again consistently if they turn out to be missing
+    or stale.
+    """
+
+    VERSION_KEY: Final = "version"
+    CHECKPOINT_INTERVAL: Final = 16
+
+    def __init__(
+        self,
+        table_name: str,
+        key: str,
+        ttl_key: str,
+        ttl_in_seconds: int,
+        is_read_consistent: bool = True,
+        checkpoint_interval: int = CHECKPOINT_INTERVAL,
+        max_size: int = 128,
+        legacy_game_repository: Optional[GameRepository] = None,
+    ):
+        DynamodbStorage.__init__(self, table_name, key, ttl_key, ttl_in_seconds)
+        self._is_read_consistent = is_read_consistent
+        self._checkpoint_interval = checkpoint_interval
+        self._max_size = max_size
+        self._legacy_game_repository = legacy_game_repository
+        self._stale_game_ids: set[str] = set()
+        # The recently fetched or stored games, to tell what has happened
+        # since, and the expiration times of their checkpoints
+        self._games: OrderedDict[str, tuple[Game, int]] = OrderedDict()
+
+    def store(self, game: Game) -> None:
+        version = game.version + 1
+        stored_game, checkpoint_expiration_time = self._games.pop(game.id, (None, 0))
+        events = None
+        if (
+            stored_game
+            and stored_game.version == game.version
+            and version % self._checkpoint_interval
+            and checkpoint_expiration_time >= self.get_expiration_time()
+        ):
+            events = encode_events(stored_game, game)
+        item: dict[str, Any] = {self._key: game.id, self.VERSION_KEY: version}
+        if events is None:
+            checkpoint_expiration_time = (
+                self.get_expiration_time() + self._ttl_in_seconds
+            )
+            item["game"] = encode_game(game)
+        else:
+            item["events"] = events
+        item[self._ttl_key] = checkpoint_expiration_time
+        try:
+            self._table.put_item(
+                Item=item, ConditionExpression=Attr(self.VERSION_KEY).not_exists()
+            )
+        except self._table.meta.client.exceptions.ConditionalCheckFailedException:
+            self._stale_game_ids.add(game.id)
+            raise StaleGameException(game.id)
+        game.version = version
+        game.turns.clear()
+        self._remember(game, checkpoint_expiration_time)
+
+    def store_many(self, games: Sequence[Game]) -> None:
+        checkpoint_expiration_time = self.get_expiration_time() + self._ttl_in_seconds
+        # Batch writes cannot be conditional, but nobody else has the new games
+        with self._table.batch_writer() as batch:
+            for game in games:
+                batch.put_item(
+                    Item={
+                        self._key: game.id,
+                        self.VERSION_KEY: game.version + 1,
+                        self._ttl_key: checkpoint_expiration_time,
+                        "game": encode_game(game),
+                    }
+                )
+        for game in games:
+            game.version += 1
+            game.turns.clear()
+            self._remember(game, checkpoint_expiration_time)
+
+    def fetch(self, game_id: str) -> Game:
+        is_read_consistent = self._is_read_consistent or game_id in self._stale_game_ids
+        items = self._get_items_since_checkpoint(game_id, is_read_consistent)
+        if items is None and not is_read_consistent:
+            items = self._get_items_since_checkpoint(game_id, True)
+        if items is None:
+            if self._legacy_game_repository is None:
+                raise NoSuchGameException(game_id)
+            game = self._legacy_game_repository.fetch(game_id)
+            # Without a checkpoint, the next store writes one
+            self._remember(game, 0)
+            return game
+        self._stale_game_ids.discard(game_id)
+
+        checkpoint = items[-1]
+        game = decode_game(bytes(checkpoint["game"]))
+        for item in reversed(items[:-1]):
+            replay_events(game, bytes(item["events"]))
+        game.version = int(items[0][self.VERSION_KEY])
+        self._remember(game, int(checkpoint[self._ttl_key]))
+        return game
+
+    def fetch_version(self, game_id: str) -> int:
+        is_read_consistent = self._is_read_consistent or game_id in self._stale_game_ids
+        item = self._get_latest_item(game_id, is_read_consistent)
+        if item is None and not is_read_consistent:
+            item = self._get_latest_item(game_id, True)
+        if item is not None:
+            return int(item[self.VERSION_KEY])
+        if self._legacy_game_repository is None:
+            raise NoSuchGameException(game_id)
+        return self._legacy_game_repository.fetch_version(game_id)
+
+    def _get_items_since_checkpoint(
+        self, game_id: str, is_read_consistent: bool
+    ) -> Optional[list[dict[str, Any]]]:
+        """Returns the items of the game, latest first, down to its checkpoint.
+
+        Returns None if the game is missing or has expired.
+        """
+        items = []
+        for item in self._query(game_id, is_read_consistent, self._checkpoint_interval):
+            if self._is_expired(item):
+                return None
+            items.append(item)
+            if "game" in item:
+                return items
+        return None
+
+    def _get_latest_item(
+        self, game_id: str, is_read_consistent: bool
+    ) -> Optional[dict[str, Any]]:
+        for item in self._query(
+            game_id, is_read_consistent, 1, self.VERSION_KEY, self._ttl_key
+        ):
+            return None if self._is_expired(item) else item
+        return None
+
+    def _query(
+        self,
+        game_id: str,
+        is_read_consistent: bool,
+        page_size: int,
+        *attribute_names: str,
+    ) -> Iterator[dict[str, Any]]:
+        """Yields the items of the game, latest first, a page at a time."""
+        query: dict[str, Any] = {
+            "KeyConditionExpression": Key(self._key).eq(game_id),
+            "ScanIndexForward": False,
+            "ConsistentRead": is_read_consistent,
+            "Limit": page_size,
+        }
+        if attribute_names:
+            names = {f"#{i}": name for i, name in enumerate(attribute_names)}
+            query["ProjectionExpression"] = ", ".join(names)
+            query["ExpressionAttributeNames"] = names
+        while True:
+            page = self._table.query(**query)
+            yield from page["Items"]
+            if "LastEvaluatedKey" not in page:
+                return
+            query["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
+    def _is_expired(self, item: dict[str, Any]) -> bool:
+        # DynamoDB deletes expired items some time after they expire
+        return int(item[self._ttl_key]) < time()
+
+    def _remember(self, game: Game, checkpoint_expiration_time: int) -> None:
+        self._games[game.id] = game.clone(), checkpoint_expiration_time
+        self._games.move_to_end(game.id)
+        if len(self._games) > self._max_size:
+            self._games.popitem(last=False)
@@ -0,0 +1,187 @@
+import mmap
+import os
+from struct import Struct
+from threading import Lock
+from typing import Final, Iterator, Optional, Union, cast
+
+from paper_tactics.adapters.game_codec import decode_game, encode_game
+from paper_tactics.adapters.in_memory_game_repository import InMemoryGameRepository
+from paper_tactics.entities.game import Game
+
+MAX_LOG_SIZE: Final = 64 * 1024 * 1024
+
+# Game length, version, id length
+_RECORD_HEADER: Final = Struct("<IIH")
+
+
+class FileGameRepository(InMemoryGameRepository):
+    """Keeps the games in memory and writes them behind to a directory.
+
+    Stored games are only appended to the log by flush, which is meant to be
+    called on an interval away from the turns. Once the log grows past
+    max_log_size, flush compacts it into a snapshot. The snapshot is memory
+    mapped on startup and its games are only decoded as they are fetched.
+    """
+
+    def __init__(self, directory: str, max_log_size: int = MAX_LOG_SIZE):
+        super().__init__()
+        os.makedirs(directory, exist_ok=True)
+        self._log_path = os.path.join(directory, "games.log")
+        self._snapshot_path = os.path.join(directory, "games.snapshot")
+        self._max_log_size = max_log_size
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._pending_records = bytearray()
+        self._snapshot: Optional[mmap.mmap]
+        # Games not fetched since startup, by id: version, start and end
+        self._snapshot_index: dict[str, tuple[int, int, int]]
+        self._snapshot, self._snapshot_index = _map_snapshot(self._snapshot_path)
+        self._replay_log()
+        self._log = open(self._log_path, "ab")
+
+    def store(self, game: Game) -> None:
+        with self._lock:
+            self._load(game.id)
+            super().store(game)
+            self._pending_records += _encode_record(game)
+
+    def fetch(self, game_id: str) -> Game:
+        with self._lock:
+            self._load(game_id)
+            return super().fetch(game_id)
+
+    def fetch_version(self, game_id: str) -> int:
+        with self._lock:
+            if game_id in self._snapshot_index:
+                version, _, _ = self._snapshot_index[game_id]
+                return version
+            return super().fetch_version(game_id)
+
+    def flush(self) -> None:
+        """Appends the games stored since the last flush to the log and syncs it.
+
+        Blocks on the disk, so it should be called outside of the event loop.
+        """
+        with self._flush_lock:
+            with self._lock:
+                records, self._pending_records = self._pending_records, bytearray()
+            if records:
+                self._log.write(records)
+                self._log.flush()
+                os.fsync(self._log.fileno())
+            if self._log.tell() > self._max_log_size:
+                self._compact()
+
+    def close(self) -> None:
+        self._log.close()
+        if self._snapshot is not None:
+            self._snapshot.close()
+
+    def _compact(self) -> None:
+        # Stored games are replaced rather than changed, so they are encoded
+        # while turns go on
+        with self._lock:
+            games = list(self._games.values())
+            snapshot, snapshot_index = self._snapshot, dict(self._snapshot_index)
+
+        temporary_path = self._snapshot_path + ".tmp"
+        with open(temporary_path, "wb") as file:
+            for game in games:
+                file.write(_encode_record(game))
+            # Games not fetched since startup are copied as they are
+            for _, start, end in snapshot_index.values():
+                file.write(cast(mmap.mmap, snapshot)[start:end])
+            file.flush()
+            os.fsync(file.fileno())
+
+        # Games stored meanwhile are still pending, so the log holds nothing
+        # the new snapshot lacks
+        os.replace(temporary_path, self._snapshot_path)
+        self._log.seek(0)
+        self._log.truncate()
+        new_snapshot, new_snapshot_index = _map_snapshot(self._snapshot_path)
+        with self._lock:
+            self._snapshot = new_snapshot
+            # Games fetched meanwhile are kept in memory
+            self._snapshot_index = {
+                game_id: new_snapshot_index[game_id]
+                for game_id in snapshot_index
+                if game_id not in self._games
+            }
+        if snapshot is not None:
+            snapshot.close()
+
+    def _replay_log(self) -> None:
+        if not os.path.exists(self._log_path):
+            return
+        with open(self._log_path, "rb") as file:
+            log = file.read()
+        end = 0
+        for game_id, version, start, end in _read_records(log):
+            # A crash between compacting and truncating leaves an older log
+            if version > self._get_loaded_version(game_id):
+                self._snapshot_index.pop(game_id, None)
+                self._games[game_id] = _decode_record(log[start:end])
+        # A record torn by a crash is dropped
+        os.truncate(self._log_path, end)
+
+    def _get_loaded_version(self, game_id: str) -> int:
+        if game_id in self._snapshot_index:
+            version, _, _ = self._snapshot_index[game_id]
+            return version
+        if game_id in self._games:
+            return self._games[game_id].version
+        return 0
+
+    def _load(self, game_id: str) -> None:
+        if game_id not in self._snapshot_index:
+            return
+        _, start, end = self._snapshot_index.pop(game_id)
+        snapshot = cast(mmap.mmap, self._snapshot)
+        self._games[game_id] = _decode_record(snapshot[start:end])
+
+
+def _encode_record(game: Game) -> bytes:
+    game_id = game.id.encode()
+    data = encode_game(game)
+    return _RECORD_HEADER.pack(len(data), game.version, len(game_id)) + game_id + data
+
+
+def _decode_record(record: bytes) -> Game:
+    _, version, id_length = _RECORD_HEADER.unpack_from(record)
+    game = decode_game(record[_RECORD_HEADER.size + id_length :])
+    game.version = version
+    return game
+
+
+def _map_snapshot(
+    path: str,
+) -> tuple[Optional[mmap.mmap], dict[str, tuple[int, int, int]]]:
+    """Maps the snapshot into memory and indexes its games."""
+    if not os.path.exists(path):
+        return None, {}
+    with open(path, "rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            return None, {}
+        snapshot = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    snapshot_index = {
+        game_id: (version, start, end)
+        for game_id, version, start, end in _read_records(snapshot)
+    }
+    return snapshot, snapshot_index
+
+
+def _read_records(
+    records: Union[bytes, mmap.mmap],
+) -> Iterator[tuple[str, int, int, int]]:
+    """Yields the id, version, start and end of every complete record."""
+    start = 0
+    while start + _RECORD_HEADER.size <= len(records):
+        length, version, id_length = _RECORD_HEADER.unpack_from(records, start)
+        id_end = start + _RECORD_HEADER.size + id_length
+        end = id_end + length
+        if end > len(records):
+            return
+        game_id = records[start + _RECORD_HEADER.size : id_end].decode()
+        yield game_id, version, start, end
+        start = end
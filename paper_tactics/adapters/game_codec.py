@@ -0,0 +1,146 @@
+import json
+from struct import Struct
+from typing import Final
+
+from paper_tactics.entities.game import Game
+from paper_tactics.entities.game_preferences import GamePreferences
+from paper_tactics.entities.player import Player
+
+FORMAT_VERSION: Final = 1
+
+# Format version, turns left, size, turn count, trench density, flags
+_GAME_HEADER: Final = Struct("<BBBBBB")
+# Flags, view version, acknowledged view mask count
+_PLAYER_HEADER: Final = Struct("<BIB")
+_LENGTH: Final = Struct("<H")
+
+
+def encode_game(game: Game) -> bytes:
+    """Packs a game into bytes, masks being length prefixed bitboards."""
+    preferences = game.preferences
+    data = bytearray(
+        _GAME_HEADER.pack(
+            FORMAT_VERSION,
+            game.turns_left,
+            preferences.size,
+            preferences.turn_count,
+            preferences.trench_density_percent,
+            preferences.is_visibility_applied
+            | preferences.is_against_bot << 1
+            | preferences.is_double_base << 2,
+        )
+    )
+    _write_string(data, game.id)
+    _write_string(data, preferences.code)
+    _write_mask(data, game.trench_mask)
+    for player in game.active_player, game.passive_player:
+        _write_player(data, player)
+    return bytes(data)
+
+
+def decode_game(data: bytes) -> Game:
+    reader = _Reader(data)
+    (
+        format_version,
+        turns_left,
+        size,
+        turn_count,
+        trench_density_percent,
+        flags,
+    ) = reader.read(_GAME_HEADER)
+    if format_version != FORMAT_VERSION:
+        raise UnknownFormatException(format_version)
+    return Game(
+        id=reader.read_string(),
+        preferences=GamePreferences(
+            size=size,
+            turn_count=turn_count,
+            is_visibility_applied=bool(flags & 1),
+            is_against_bot=bool(flags & 2),
+            trench_density_percent=trench_density_percent,
+            is_double_base=bool(flags & 4),
+            code=reader.read_string(),
+        ),
+        turns_left=turns_left,
+        trench_mask=reader.read_mask(),
+        active_player=_read_player(reader),
+        passive_player=_read_player(reader),
+    )
+
+
+def _write_player(data: bytearray, player: Player) -> None:
+    data += _PLAYER_HEADER.pack(
+        player.is_gone | player.is_defeated << 1 | player.is_view_delta_enabled << 2,
+        player.view_version,
+        len(player.acknowledged_view_masks),
+    )
+    _write_string(data, player.id)
+    _write_string(data, json.dumps(player.view_data))
+    for mask in (
+        player.unit_mask,
+        player.wall_mask,
+        player.reachable_mask,
+        player.visible_opponent_mask,
+        player.visible_terrain_mask,
+        *player.acknowledged_view_masks,
+    ):
+        _write_mask(data, mask)
+
+
+def _read_player(reader: "_Reader") -> Player:
+    flags, view_version, acknowledged_view_mask_count = reader.read(_PLAYER_HEADER)
+    return Player(
+        id=reader.read_string(),
+        view_data=json.loads(reader.read_string()),
+        unit_mask=reader.read_mask(),
+        wall_mask=reader.read_mask(),
+        reachable_mask=reader.read_mask(),
+        visible_opponent_mask=reader.read_mask(),
+        visible_terrain_mask=reader.read_mask(),
+        is_gone=bool(flags & 1),
+        is_defeated=bool(flags & 2),
+        is_view_delta_enabled=bool(flags & 4),
+        view_version=view_version,
+        acknowledged_view_masks=tuple(
+            reader.read_mask() for _ in range(acknowledged_view_mask_count)
+        ),
+    )
+
+
+def _write_string(data: bytearray, value: str) -> None:
+    encoded = value.encode()
+    data += _LENGTH.pack(len(encoded))
+    data += encoded
+
+
+def _write_mask(data: bytearray, mask: int) -> None:
+    length = (mask.bit_length() + 7) // 8
+    data.append(length)
+    data += mask.to_bytes(length, "little")
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self._data = data
+        self._offset = 0
+
+    def read(self, struct: Struct) -> tuple:
+        values = struct.unpack_from(self._data, self._offset)
+        self._offset += struct.size
+        return values
+
+    def read_string(self) -> str:
+        (length,) = self.read(_LENGTH)
+        self._offset += length
+        return self._data[self._offset - length : self._offset].decode()
+
+    def read_mask(self) -> int:
+        length = self._data[self._offset]
+        self._offset += 1 + length
+        return int.from_bytes(
+            self._data[self._offset - length : self._offset], "little"
+        )
+
+
+class UnknownFormatException(Exception):
+    pass
@@ -0,0 +1,164 @@
+import json
+from struct import Struct
+from typing import Final, Union
+
+from paper_tactics.entities.bitboard import STRIDE, from_cells
+from paper_tactics.entities.cell import Cell
+from paper_tactics.entities.game_preferences import GamePreferences
+from paper_tactics.entities.game_view import GameView
+from paper_tactics.entities.game_view_delta import GameViewDelta, PlayerViewDelta
+from paper_tactics.entities.player_view import PlayerView
+
+# Format version, kind, flags, turns left, version, base version
+BITMASK_HEADER: Final = Struct(">BBBBII")
+BITMASK_LENGTH: Final = STRIDE * STRIDE // 8
+BITMASK_FORMAT_VERSION: Final = 1
+BITMASK_VIEW: Final = 0
+BITMASK_VIEW_DELTA: Final = 1
+
+
+def encode_json(game_view: Union[GameView, GameViewDelta]) -> str:
+    """Encodes a view as dataclasses.asdict followed by json.dumps would."""
+    if isinstance(game_view, GameViewDelta):
+        return (
+            f'{{"id":{_encode_string(game_view.id)}'
+            f',"version":{game_view.version}'
+            f',"base_version":{game_view.base_version}'
+            f',"turns_left":{game_view.turns_left}'
+            f',"my_turn":{_encode_bool(game_view.my_turn)}'
+            f',"me":{_encode_player_view_delta(game_view.me)}'
+            f',"opponent":{_encode_player_view_delta(game_view.opponent)}'
+            f',"added_trenches":{_encode_cells(game_view.added_trenches)}'
+            f',"removed_trenches":{_encode_cells(game_view.removed_trenches)}}}'
+        )
+    return (
+        f'{{"id":{_encode_string(game_view.id)}'
+        f',"turns_left":{game_view.turns_left}'
+        f',"my_turn":{_encode_bool(game_view.my_turn)}'
+        f',"me":{_encode_player_view(game_view.me)}'
+        f',"opponent":{_encode_player_view(game_view.opponent)}'
+        f',"trenches":{_encode_cells(game_view.trenches)}'
+        f',"preferences":{_encode_preferences(game_view.preferences)}'
+        f',"version":{game_view.version}}}'
+    )
+
+
+def encode_bitmask(game_view: Union[GameView, GameViewDelta]) -> bytes:
+    """Encodes a view as a header, cell masks and a JSON tail.
+
+    Masks are bitboards of BITMASK_LENGTH little-endian bytes with cell (x, y)
+    at bit x * 16 + y. The JSON tail holds the fields that are neither cells
+    nor flags.
+    """
+    if isinstance(game_view, GameViewDelta):
+        header = BITMASK_HEADER.pack(
+            BITMASK_FORMAT_VERSION,
+            BITMASK_VIEW_DELTA,
+            _get_flags(game_view),
+            game_view.turns_left,
+            game_view.version,
+            game_view.base_version,
+        )
+        masks = (
+            game_view.me.added_units,
+            game_view.me.removed_units,
+            game_view.me.added_walls,
+            game_view.me.removed_walls,
+            game_view.me.added_reachable,
+            game_view.me.removed_reachable,
+            game_view.opponent.added_units,
+            game_view.opponent.removed_units,
+            game_view.opponent.added_walls,
+            game_view.opponent.removed_walls,
+            game_view.added_trenches,
+            game_view.removed_trenches,
+        )
+        tail = f'{{"id":{_encode_string(game_view.id)}}}'
+    else:
+        header = BITMASK_HEADER.pack(
+            BITMASK_FORMAT_VERSION,
+            BITMASK_VIEW,
+            _get_flags(game_view),
+            game_view.turns_left,
+            game_view.version,
+            0,
+        )
+        masks = (
+            game_view.me.units,
+            game_view.me.walls,
+            game_view.me.reachable,
+            game_view.opponent.units,
+            game_view.opponent.walls,
+            game_view.trenches,
+        )
+        tail = (
+            f'{{"id":{_encode_string(game_view.id)}'
+            f',"preferences":{_encode_preferences(game_view.preferences)}'
+            f',"me":{{"view_data":{json.dumps(game_view.me.view_data)}}}'
+            f',"opponent":{{"view_data":{json.dumps(game_view.opponent.view_data)}}}}}'
+        )
+    return b"".join(
+        (
+            header,
+            *(from_cells(mask).to_bytes(BITMASK_LENGTH, "little") for mask in masks),
+            tail.encode(),
+        )
+    )
+
+
+def _get_flags(game_view: Union[GameView, GameViewDelta]) -> int:
+    return (
+        game_view.my_turn
+        | game_view.me.is_gone << 1
+        | game_view.me.is_defeated << 2
+        | game_view.opponent.is_gone << 3
+        | game_view.opponent.is_defeated << 4
+    )
+
+
+def _encode_player_view(player_view: PlayerView) -> str:
+    return (
+        f'{{"units":{_encode_cells(player_view.units)}'
+        f',"walls":{_encode_cells(player_view.walls)}'
+        f',"reachable":{_encode_cells(player_view.reachable)}'
+        f',"view_data":{json.dumps(player_view.view_data)}'
+        f',"is_gone":{_encode_bool(player_view.is_gone)}'
+        f',"is_defeated":{_encode_bool(player_view.is_defeated)}}}'
+    )
+
+
+def _encode_player_view_delta(player_view_delta: PlayerViewDelta) -> str:
+    return (
+        f'{{"added_units":{_encode_cells(player_view_delta.added_units)}'
+        f',"removed_units":{_encode_cells(player_view_delta.removed_units)}'
+        f',"added_walls":{_encode_cells(player_view_delta.added_walls)}'
+        f',"removed_walls":{_encode_cells(player_view_delta.removed_walls)}'
+        f',"added_reachable":{_encode_cells(player_view_delta.added_reachable)}'
+        f',"removed_reachable":{_encode_cells(player_view_delta.removed_reachable)}'
+        f',"is_gone":{_encode_bool(player_view_delta.is_gone)}'
+        f',"is_defeated":{_encode_bool(player_view_delta.is_defeated)}}}'
+    )
+
+
+def _encode_preferences(preferences: GamePreferences) -> str:
+    return (
+        f'{{"size":{preferences.size}'
+        f',"turn_count":{preferences.turn_count}'
+        f',"is_visibility_applied":{_encode_bool(preferences.is_visibility_applied)}'
+        f',"is_against_bot":{_encode_bool(preferences.is_against_bot)}'
+        f',"trench_density_percent":{preferences.trench_density_percent}'
+        f',"is_double_base":{_encode_bool(preferences.is_double_base)}'
+        f',"code":{_encode_string(preferences.code)}}}'
+    )
+
+
+def _encode_cells(cells: frozenset[Cell]) -> str:
+    return "[" + ",".join(f"[{x},{y}]" for x, y in cells) + "]"
+
+
+def _encode_bool(value: bool) -> str:
+    return "true" if value else "false"
+
+
+def _encode_string(value: str) -> str:
+    return json.dumps(value)
@@ -1,7 +1,9 @@
-from dataclasses import replace
-
 from paper_tactics.entities.game import Game
-from paper_tactics.ports.game_repository import GameRepository, NoSuchGameException
+from paper_tactics.ports.game_repository import (
+    GameRepository,
+    NoSuchGameException,
+    StaleGameException,
+)
 
 
 class InMemoryGameRepository(GameRepository):
@@ -9,9 +11,19 @@ class InMemoryGameRepository(GameRepository):
         self._games: dict[str, Game] = {}
 
     def store(self, game: Game) -> None:
-        self._games[game.id] = replace(game)
+        stored_game = self._games.get(game.id)
+        if (stored_game.version if stored_game else 0) != game.version:
+            raise StaleGameException(game.id)
+        game.version += 1
+        game.turns.clear()
+        self._games[game.id] = game.clone()
 
     def fetch(self, game_id: str) -> Game:
         if game_id in self._games:
-            return self._games[game_id]
+            return self._games[game_id].clone()
+        raise NoSuchGameException(game_id)
+
+    def fetch_version(self, game_id: str) -> int:
+        if game_id in self._games:
+            return self._games[game_id].version
         raise NoSuchGameException(game_id)
@@ -1,3 +1,5 @@
+from collections import OrderedDict
+from time import monotonic
 from typing import Optional
 
 from paper_tactics.entities.game_preferences import GamePreferences
@@ -6,21 +8,58 @@ from paper_tactics.ports.match_request_queue import MatchRequestQueue
 
 
 class InMemoryMatchRequestQueue(MatchRequestQueue):
-    def __init__(self) -> None:
-        self._match_requests: list[MatchRequest] = []
+    """Requests are kept in insertion order per preferences."""
+
+    def __init__(self, ttl_in_seconds: Optional[float] = None) -> None:
+        self._ttl_in_seconds = ttl_in_seconds
+        self._match_requests: dict[
+            GamePreferences, OrderedDict[str, tuple[MatchRequest, float]]
+        ] = {}
+        self._preferences: dict[str, GamePreferences] = {}
 
     def put(self, request: MatchRequest) -> None:
-        self._match_requests.append(request)
+        self.remove(request.id)
+        expiration_time = (
+            monotonic() + self._ttl_in_seconds
+            if self._ttl_in_seconds is not None
+            else float("inf")
+        )
+        self._match_requests.setdefault(request.game_preferences, OrderedDict())[
+            request.id
+        ] = (request, expiration_time)
+        self._preferences[request.id] = request.game_preferences
 
     def pop(self, game_preferences: GamePreferences) -> Optional[MatchRequest]:
-        queued_request = next(
-            (
-                request
-                for request in self._match_requests
-                if request.game_preferences == game_preferences
-            ),
-            None,
-        )
-        if queued_request:
-            self._match_requests.remove(queued_request)
-        return queued_request
+        match_requests = self._match_requests.get(game_preferences, OrderedDict())
+        now = monotonic()
+        request: Optional[MatchRequest] = None
+        while match_requests and request is None:
+            request_id, (queued_request, expiration_time) = match_requests.popitem(
+                last=False
+            )
+            del self._preferences[request_id]
+            if expiration_time > now:
+                request = queued_request
+        if not match_requests:
+            self._match_requests.pop(game_preferences, None)
+        return request
+
+    def pop_many(self, max_count: int) -> list[MatchRequest]:
+        requests: list[MatchRequest] = []
+        for game_preferences in list(self._match_requests):
+            while len(requests) < max_count:
+                request = self.pop(game_preferences)
+                if request is None:
+                    break
+                requests.append(request)
+        return requests
+
+    def remove(self, request_id: str) -> None:
+        """Drops the request if it is still queued."""
+        game_preferences = self._preferences.pop(request_id, None)
+        if game_preferences is None:
+            return
+        match_requests = self._match_requests[game_preferences]
+        del match_requests[request_id]
+        if not match_requests:
+            del self._match_requests[game_preferences]
@@ -0,0 +1,102 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import astuple, dataclass, fields, replace
+from math import ceil
+from os import cpu_count
+from random import Random
+from typing import Any, Optional
+
+from paper_tactics.entities.cell import Cell
+from paper_tactics.entities.game import Game
+from paper_tactics.entities.game_preferences import GamePreferences
+from paper_tactics.entities.game_view import GameView
+from paper_tactics.entities.player import Player
+from paper_tactics.entities.tree_search_game_bot import TreeSearchGameBot, simulate
+
+_executors: dict[int, ProcessPoolExecutor] = {}
+
+
+@dataclass(frozen=True)
+class ProcessPoolGameBot(TreeSearchGameBot):
+    """Runs independent tree searches in worker processes and merges them.
+
+    Every worker searches for the whole time budget, the playout budget is
+    split between the workers.
+    """
+
+    worker_count: int = cpu_count() or 1
+
+    def search(
+        self, game_view: GameView, seed: Optional[int] = None
+    ) -> dict[Cell, tuple[int, float]]:
+        worker_bot = replace(
+            TreeSearchGameBot(
+                **{
+                    field.name: getattr(self, field.name)
+                    for field in fields(TreeSearchGameBot)
+                }
+            ),
+            playout_budget=ceil(self.playout_budget / self.worker_count),
+        )
+        serialized_game = _serialize_game(simulate(game_view))
+        random = Random(seed)
+        futures = [
+            get_executor(self.worker_count).submit(
+                _search, worker_bot, serialized_game, random.getrandbits(64)
+            )
+            for _ in range(self.worker_count)
+        ]
+
+        statistics: dict[Cell, tuple[int, float]] = {}
+        for future in futures:
+            for cell, (visit_count, reward) in sorted(future.result().items()):
+                total_visit_count, total_reward = statistics.get(cell, (0, 0.0))
+                statistics[cell] = (
+                    total_visit_count + visit_count,
+                    total_reward + reward,
+                )
+        return statistics
+
+
+def get_executor(worker_count: int) -> ProcessPoolExecutor:
+    """Returns a process pool that is kept alive between searches."""
+    if worker_count not in _executors:
+        _executors[worker_count] = ProcessPoolExecutor(worker_count)
+    return _executors[worker_count]
+
+
+def _search(
+    game_bot: TreeSearchGameBot, serialized_game: tuple[Any, ...], seed: int
+) -> dict[Cell, tuple[int, float]]:
+    return game_bot.search_game(_deserialize_game(serialized_game), seed)
+
+
+def _serialize_game(game: Game) -> tuple[Any, ...]:
+    return (
+        astuple(game.preferences),
+        game.turns_left,
+        _serialize_player(game.active_player),
+        _serialize_player(game.passive_player),
+        game.trench_mask,
+    )
+
+
+def _deserialize_game(source: tuple[Any, ...]) -> Game:
+    preferences, turns_left, active_player, passive_player, trench_mask = source
+    return Game(
+        preferences=GamePreferences(*preferences),
+        turns_left=turns_left,
+        active_player=_deserialize_player(active_player),
+        passive_player=_deserialize_player(passive_player),
+        trench_mask=trench_mask,
+    )
+
+
+def _serialize_player(player: Player) -> tuple[Any, ...]:
+    return player.id, player.unit_mask, player.wall_mask, player.reachable_mask
+
+
+def _deserialize_player(source: tuple[Any, ...]) -> Player:
+    id, unit_mask, wall_mask, reachable_mask = source
+    return Player(
+        id, unit_mask=unit_mask, wall_mask=wall_mask, reachable_mask=reachable_mask
+    )
@@ -0,0 +1,67 @@
+from typing import Sequence
+from zlib import crc32
+
+from paper_tactics.adapters.unix_socket_rpc import Handlers, RpcClient
+from paper_tactics.entities.game import Game
+from paper_tactics.ports.game_repository import GameRepository
+
+
+def get_shard_index(game_id: str, shard_count: int) -> int:
+    """Returns the same shard in every process, unlike hash()."""
+    return crc32(game_id.encode()) % shard_count
+
+
+def get_game_repository_handlers(game_repository: GameRepository) -> Handlers:
+    """Returns the handlers a shard serves the games it keeps with."""
+
+    async def store(game: Game) -> int:
+        game_repository.store(game)
+        return game.version
+
+    async def store_many(games: list[Game]) -> list[int]:
+        game_repository.store_many(games)
+        return [game.version for game in games]
+
+    async def fetch(game_id: str) -> Game:
+        return game_repository.fetch(game_id)
+
+    async def fetch_version(game_id: str) -> int:
+        return game_repository.fetch_version(game_id)
+
+    return {
+        "store": store,
+        "store_many": store_many,
+        "fetch": fetch,
+        "fetch_version": fetch_version,
+    }
+
+
+class ShardedGameRepository(GameRepository):
+    """Keeps every game in the shard its id hashes to."""
+
+    def __init__(self, shards: Sequence[RpcClient]):
+        self._shards = shards
+
+    def store(self, game: Game) -> None:
+        game.version = self._get_shard(game.id).call("store", game)
+        game.turns.clear()
+
+    def store_many(self, games: Sequence[Game]) -> None:
+        games_by_shard: dict[int, list[Game]] = {}
+        for game in games:
+            shard_index = get_shard_index(game.id, len(self._shards))
+            games_by_shard.setdefault(shard_index, []).append(game)
+        for shard_index, shard_games in games_by_shard.items():
+            versions = self._shards[shard_index].call("store_many", shard_games)
+            for game, version in zip(shard_games, versions):
+                game.version = version
+                game.turns.clear()
+
+    def fetch(self, game_id: str) -> Game:
+        return self._get_shard(game_id).call("fetch", game_id)
+
+    def fetch_version(self, game_id: str) -> int:
+        return self._get_shard(game_id).call("fetch_version", game_id)
+
+    def _get_shard(self, game_id: str) -> RpcClient:
+        return self._shards[get_shard_index(game_id, len(self._shards))]
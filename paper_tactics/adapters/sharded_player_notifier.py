@@ -0,0 +1,44 @@
+from typing import Optional, Sequence, Union
+from uuid import uuid4
+
+from paper_tactics.adapters.unix_socket_rpc import Handlers, RpcClient
+from paper_tactics.entities.game_view import GameView
+from paper_tactics.entities.game_view_delta import GameViewDelta
+from paper_tactics.ports.player_notifier import AsyncPlayerNotifier
+
+
+def make_player_id(shard_index: int) -> str:
+    """Returns a new id of a player connected to the shard."""
+    return f"{shard_index}-{uuid4().hex}"
+
+
+def get_player_shard_index(player_id: str) -> int:
+    return int(player_id.split("-", 1)[0])
+
+
+def get_player_notifier_handlers(player_notifier: AsyncPlayerNotifier) -> Handlers:
+    """Returns the handlers a shard serves the players connected to it with."""
+    return {"notify": player_notifier.notify}
+
+
+class ShardedPlayerNotifier(AsyncPlayerNotifier):
+    """Notifies the players through the shards they are connected to."""
+
+    def __init__(
+        self,
+        shards: Sequence[RpcClient],
+        shard_index: Optional[int] = None,
+        player_notifier: Optional[AsyncPlayerNotifier] = None,
+    ):
+        self._shards = shards
+        self._shard_index = shard_index
+        self._player_notifier = player_notifier
+
+    async def notify(
+        self, player_id: str, game_view: Union[GameView, GameViewDelta]
+    ) -> None:
+        shard_index = get_player_shard_index(player_id)
+        if shard_index == self._shard_index and self._player_notifier:
+            await self._player_notifier.notify(player_id, game_view)
+        else:
+            await self._shards[shard_index].call_async("notify", player_id, game_view)
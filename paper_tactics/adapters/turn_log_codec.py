@@ -0,0 +1,125 @@
+from struct import Struct
+from typing import Final, Optional, Union
+
+from paper_tactics.entities.game import Game, IllegalTurnException
+from paper_tactics.entities.player import Player
+from paper_tactics.entities.turn import Turn
+
+FORMAT_VERSION: Final = 1
+
+_TURN: Final = 0
+_LEAVE: Final = 1
+_ACKNOWLEDGE: Final = 2
+
+# Kind, length of the player id
+_EVENT_HEADER: Final = Struct("<BH")
+# Cell, bot cell count
+_TURN_HEADER: Final = Struct("<BBB")
+_CELL: Final = Struct("<BB")
+
+# A turn, or the id of a player who left or received a view
+_Event = tuple[int, Union[Turn, str]]
+
+
+def encode_events(stored_game: Game, game: Game) -> Optional[bytes]:
+    """Packs what happened to the stored game since it was fetched.
+
+    Returns None unless the turns of the game, the players leaving and the
+    views they received replay to exactly the game.
+    """
+    for events in _get_events(stored_game, game):
+        replayed_game = stored_game.clone()
+        try:
+            for event in events:
+                _replay(replayed_game, event)
+        except (IllegalTurnException, AssertionError, IndexError):
+            continue
+        replayed_game.version = game.version
+        if replayed_game == game:
+            data = bytearray([FORMAT_VERSION])
+            for event in events:
+                _write_event(data, event)
+            return bytes(data)
+    return None
+
+
+def replay_events(game: Game, data: bytes) -> None:
+    if data[0] != FORMAT_VERSION:
+        raise UnknownFormatException(data[0])
+    offset = 1
+    while offset < len(data):
+        kind, id_length = _EVENT_HEADER.unpack_from(data, offset)
+        offset += _EVENT_HEADER.size + id_length
+        player_id = data[offset - id_length : offset].decode()
+        if kind != _TURN:
+            _replay(game, (kind, player_id))
+            continue
+        x, y, bot_cell_count = _TURN_HEADER.unpack_from(data, offset)
+        offset += _TURN_HEADER.size
+        bot_cells = tuple(
+            _CELL.unpack_from(data, offset + i * _CELL.size)
+            for i in range(bot_cell_count)
+        )
+        offset += bot_cell_count * _CELL.size
+        _replay(game, (_TURN, Turn(player_id, (x, y), bot_cells)))
+    game.turns.clear()
+
+
+def _get_events(stored_game: Game, game: Game) -> list[list[_Event]]:
+    """Returns the orders the events most likely happened in."""
+    turns: list[_Event] = [(_TURN, turn) for turn in game.turns]
+    leaves: list[_Event] = []
+    acknowledgements: list[_Event] = []
+    leaver_acknowledgements: list[_Event] = []
+    for player in game.active_player, game.passive_player:
+        stored_player = _find_player(stored_game, player.id)
+        if stored_player is None:
+            return []
+        player_acknowledgements = [(_ACKNOWLEDGE, player.id)] * (
+            player.view_version - stored_player.view_version
+        )
+        if player.is_gone and not stored_player.is_gone:
+            leaves.append((_LEAVE, player.id))
+            leaver_acknowledgements += player_acknowledgements
+        else:
+            acknowledgements += player_acknowledgements
+    return [
+        turns + leaver_acknowledgements + acknowledgements + leaves,
+        turns + leaver_acknowledgements + leaves + acknowledgements,
+        turns + leaves + leaver_acknowledgements + acknowledgements,
+    ]
+
+
+def _replay(game: Game, event: _Event) -> None:
+    kind, value = event
+    if isinstance(value, Turn):
+        game.replay_turn(value)
+        return
+    player = _find_player(game, value)
+    assert player is not None
+    if kind == _LEAVE:
+        player.is_gone = True
+    else:
+        game.acknowledge_view(player.id)
+
+
+def _find_player(game: Game, player_id: str) -> Optional[Player]:
+    for player in game.active_player, game.passive_player:
+        if player.id == player_id:
+            return player
+    return None
+
+
+def _write_event(data: bytearray, event: _Event) -> None:
+    kind, value = event
+    player_id = (value.player_id if isinstance(value, Turn) else value).encode()
+    data += _EVENT_HEADER.pack(kind, len(player_id))
+    data += player_id
+    if isinstance(value, Turn):
+        data += _TURN_HEADER.pack(*value.cell, len(value.bot_cells))
+        for cell in value.bot_cells:
+            data += _CELL.pack(*cell)
+
+
+class UnknownFormatException(Exception):
+    pass
@@ -0,0 +1,151 @@
+"""Calls between the processes of a sharded server over unix sockets.
+
+A call is a pickled (call id, name, args) frame answered by a pickled (call id,
+is_returned, result) frame, calls over the same connection may be answered in
+any order. The sockets are expected in a directory only the user running the
+server may access, the calls are not authenticated otherwise.
+"""
+
+import asyncio
+import pickle
+import socket
+import struct
+from itertools import count
+from threading import Lock
+from typing import Any, Awaitable, Callable, Final, Optional
+
+Handlers = dict[str, Callable[..., Awaitable[Any]]]
+
+_HEADER: Final = struct.Struct("!I")
+
+
+async def serve(address: str, handlers: Handlers) -> asyncio.AbstractServer:
+    """Awaits the handlers concurrently for the calls made to the unix socket."""
+
+    async def serve_connection(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        write_lock = asyncio.Lock()
+        tasks: set[asyncio.Task] = set()
+
+        async def respond(call_id: int, name: str, args: tuple) -> None:
+            try:
+                response = call_id, True, await handlers[name](*args)
+            except Exception as e:
+                response = call_id, False, e
+            async with write_lock:
+                writer.write(_frame(response))
+                await writer.drain()
+
+        try:
+            while True:
+                try:
+                    call_id, name, args = pickle.loads(await _read_frame(reader))
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.CancelledError:
+                    # Connections end quietly as the serving process stops
+                    return
+                task = asyncio.ensure_future(respond(call_id, name, args))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            writer.close()
+
+    return await asyncio.start_unix_server(serve_connection, address)
+
+
+class RpcClient:
+    """Sends the calls to the served unix socket over a single connection.
+
+    Raises the exceptions raised by the handlers.
+    """
+
+    def __init__(self, address: str):
+        self._address = address
+        self._call_ids = count()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._receiver: Optional[asyncio.Future] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._results: dict[int, asyncio.Future] = {}
+        self._socket: Optional[socket.socket] = None
+        self._socket_lock = Lock()
+
+    async def call_async(self, name: str, *args: Any) -> Any:
+        if self._write_lock is None:
+            self._write_lock = asyncio.Lock()
+        call_id = next(self._call_ids)
+        result = self._results[call_id] = asyncio.get_running_loop().create_future()
+        try:
+            async with self._write_lock:
+                if self._writer is None:
+                    reader, self._writer = await asyncio.open_unix_connection(
+                        self._address
+                    )
+                    self._receiver = asyncio.ensure_future(
+                        self._receive_results(reader)
+                    )
+                self._writer.write(_frame((call_id, name, args)))
+                await self._writer.drain()
+            return await result
+        finally:
+            self._results.pop(call_id, None)
+
+    def call(self, name: str, *args: Any) -> Any:
+        """Blocks the calling thread until the call is answered."""
+        with self._socket_lock:
+            if self._socket is None:
+                self._socket = socket.socket(socket.AF_UNIX)
+                self._socket.connect(self._address)
+            self._socket.sendall(_frame((0, name, args)))
+            (length,) = _HEADER.unpack(_receive(self._socket, _HEADER.size))
+            _, is_returned, result = pickle.loads(_receive(self._socket, length))
+        if not is_returned:
+            raise result
+        return result
+
+    def close(self) -> None:
+        with self._socket_lock:
+            if self._socket is not None:
+                self._socket.close()
+                self._socket = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def _receive_results(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                call_id, is_returned, result = pickle.loads(await _read_frame(reader))
+                future = self._results.get(call_id)
+                if future is None or future.done():
+                    continue
+                if is_returned:
+                    future.set_result(result)
+                else:
+                    future.set_exception(result)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            self._writer = None
+            for future in self._results.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(e))
+
+
+def _frame(value: Any) -> bytes:
+    data = pickle.dumps(value)
+    return _HEADER.pack(len(data)) + data
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    (length,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return await reader.readexactly(length)
+
+
+def _receive(connection: socket.socket, length: int) -> bytes:
+    data = b""
+    while len(data) < length:
+        chunk = connection.recv(length - len(data))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        data += chunk
+    return data
@@ -1,28 +1,105 @@
 import asyncio
-from dataclasses import asdict
-import json
+from collections import deque
+from typing import Final, Union
 
 from bidict import bidict
 from websockets.exceptions import ConnectionClosed
 from websockets.server import WebSocketServerProtocol
 
+from paper_tactics.adapters.game_view_encoder import encode_bitmask, encode_json
 from paper_tactics.entities.game_view import GameView
-from paper_tactics.ports.player_notifier import PlayerGoneException, PlayerNotifier
+from paper_tactics.entities.game_view_delta import GameViewDelta
+from paper_tactics.ports.player_notifier import (
+    AsyncPlayerNotifier,
+    PlayerGoneException,
+)
 
+MAX_QUEUED_MESSAGE_COUNT: Final = 16
 
-class WebsocketsPlayerNotifier(PlayerNotifier):
-    def __init__(self) -> None:
+# An encoded view and whether it has been sent
+_Message = tuple[Union[str, bytes], "asyncio.Future[None]"]
+
+
+class WebsocketsAsyncPlayerNotifier(AsyncPlayerNotifier):
+    """Queues the messages of every connection and sends them in the background.
+
+    Notifying returns once the message is sent, as the view is acknowledged
+    then, and raises PlayerGoneException if the connection closes first. A
+    player who lets more than max_queued_message_count messages pile up is
+    disconnected and considered gone, so a slow socket never holds up a game
+    for long.
+    """
+
+    def __init__(self, max_queued_message_count: int = MAX_QUEUED_MESSAGE_COUNT):
         self.websockets: bidict[str, WebSocketServerProtocol] = bidict()
+        self.bitmask_player_ids: set[str] = set()
+        self.max_queued_message_count = max_queued_message_count
+        self._send_queues: dict[str, deque[_Message]] = {}
+        self._tasks: set[asyncio.Task] = set()
 
-    def notify(self, player_id: str, game_view: GameView) -> None:
-        try:
-            asyncio.get_event_loop().run_until_complete(
-                self.websockets[player_id].send(
-                    json.dumps(asdict(game_view), default=list)
-                )
-            )
-        except ConnectionClosed:
-            del self.websockets[player_id]
+    async def notify(
+        self, player_id: str, game_view: Union[GameView, GameViewDelta]
+    ) -> None:
+        websocket = self.websockets.get(player_id)
+        if websocket is None or websocket.closed:
+            self._forget(player_id)
             raise PlayerGoneException(player_id)
-        except KeyError:
+
+        send_queue = self._send_queues.setdefault(player_id, deque())
+        if len(send_queue) >= self.max_queued_message_count:
+            self._forget(player_id)
+            self._start(websocket.close(1013, "too many pending messages"))
             raise PlayerGoneException(player_id)
+
+        is_sent = asyncio.get_running_loop().create_future()
+        message = _encode(game_view, player_id in self.bitmask_player_ids)
+        send_queue.append((message, is_sent))
+        if len(send_queue) == 1:
+            self._start(self._send(player_id, websocket, send_queue))
+        await is_sent
+
+    async def join(self) -> None:
+        """Waits for the queued messages to be sent."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _send(
+        self,
+        player_id: str,
+        websocket: WebSocketServerProtocol,
+        send_queue: deque[_Message],
+    ) -> None:
+        try:
+            while send_queue:
+                message, is_sent = send_queue[0]
+                await websocket.send(message)
+                send_queue.popleft()
+                if not is_sent.done():
+                    is_sent.set_result(None)
+        except ConnectionClosed:
+            self._forget(player_id)
+        finally:
+            # The views left unsent are not acknowledged
+            for _, is_sent in send_queue:
+                if not is_sent.done():
+                    is_sent.set_exception(PlayerGoneException(player_id))
+        if self._send_queues.get(player_id) is send_queue:
+            del self._send_queues[player_id]
+
+    def _start(self, coroutine) -> None:
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _forget(self, player_id: str) -> None:
+        self.websockets.pop(player_id, None)
+        self.bitmask_player_ids.discard(player_id)
+        self._send_queues.pop(player_id, None)
+
+
+def _encode(
+    game_view: Union[GameView, GameViewDelta], is_bitmask: bool
+) -> Union[str, bytes]:
+    if is_bitmask:
+        return encode_bitmask(game_view)
+    return encode_json(game_view)
@@ -0,0 +1,108 @@
+from functools import lru_cache
+from typing import Any, Final, Iterable, Iterator
+
+from paper_tactics.entities.cell import Cell
+
+# Cell (x, y) is bit x * STRIDE + y. Rows are padded so that shifting a cell
+# by one step in any direction never wraps onto a valid cell of another row.
+STRIDE: Final = 16
+
+
+def from_cell(cell: Cell) -> int:
+    x, y = cell
+    return 1 << (x * STRIDE + y)
+
+
+def from_cells(cells: Iterable[Cell]) -> int:
+    bitboard = 0
+    for cell in cells:
+        bitboard |= from_cell(cell)
+    return bitboard
+
+
+def to_cells(bitboard: int) -> frozenset[Cell]:
+    return frozenset(_iterate_cells(bitboard))
+
+
+def has_cell(bitboard: int, cell: Cell) -> bool:
+    x, y = cell
+    return (
+        isinstance(x, int)
+        and isinstance(y, int)
+        and 0 < x < STRIDE
+        and 0 < y < STRIDE
+        and bool(bitboard >> (x * STRIDE + y) & 1)
+    )
+
+
+def count_cells(bitboard: int) -> int:
+    return bin(bitboard).count("1")
+
+
+@lru_cache(maxsize=None)
+def get_board(size: int) -> int:
+    row = ((1 << size) - 1) << 1
+    return sum(row << (x * STRIDE) for x in range(1, size + 1))
+
+
+def get_adjacent(bitboard: int, size: int) -> int:
+    return _spread(bitboard) & get_board(size)
+
+
+def get_symmetric(bitboard: int, size: int) -> int:
+    # (x, y) -> (size + 1 - x, size + 1 - y) maps bit i to bit n - 1 - i.
+    n = (size + 1) * (STRIDE + 1) + 1
+    return int(format(bitboard, f"0{n}b")[::-1], 2)
+
+
+def get_orthogonally_adjacent(bitboard: int, size: int) -> int:
+    return (
+        bitboard << 1 | bitboard >> 1 | bitboard << STRIDE | bitboard >> STRIDE
+    ) & get_board(size)
+
+
+def count_adjacent(bitboard: int) -> list[int]:
+    """Returns masks of cells with more than 0, 1, ..., 7 adjacent cells."""
+    more_than = [0] * 8
+    for offset in 1, STRIDE - 1, STRIDE, STRIDE + 1:
+        for shifted in bitboard << offset, bitboard >> offset:
+            for count in range(7, 0, -1):
+                more_than[count] |= more_than[count - 1] & shifted
+            more_than[0] |= shifted
+    return more_than
+
+
+def flood(sources: int, passable: int) -> int:
+    frontier = sources
+    while frontier:
+        frontier = _spread(frontier) & passable & ~sources
+        sources |= frontier
+    return sources
+
+
+def _spread(bitboard: int) -> int:
+    vertical = bitboard << 1 | bitboard >> 1
+    column = bitboard | vertical
+    return vertical | column << STRIDE | column >> STRIDE
+
+
+def _iterate_cells(bitboard: int) -> Iterator[Cell]:
+    while bitboard:
+        bit = bitboard & -bitboard
+        yield divmod(bit.bit_length() - 1, STRIDE)
+        bitboard ^= bit
+
+
+class CellSet:
+    """Exposes a bitboard attribute as a set of cells."""
+
+    def __init__(self, bitboard_name: str):
+        self._bitboard_name = bitboard_name
+
+    def __get__(self, instance: Any, owner: Any = None) -> Any:
+        if instance is None:
+            return self
+        return to_cells(getattr(instance, self._bitboard_name))
+
+    def __set__(self, instance: Any, cells: Iterable[Cell]) -> None:
+        setattr(instance, self._bitboard_name, from_cells(cells))
@@ -1,13 +1,26 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from random import randint
-from typing import Final, Iterable, cast
+from typing import Any, Final, Iterable, Union
 
+from paper_tactics.entities.bitboard import (
+    CellSet,
+    count_cells,
+    flood,
+    from_cell,
+    from_cells,
+    get_adjacent,
+    get_symmetric,
+    has_cell,
+    to_cells,
+)
 from paper_tactics.entities.cell import Cell
 from paper_tactics.entities.game_bot import GameBot
 from paper_tactics.entities.game_preferences import GamePreferences
 from paper_tactics.entities.game_view import GameView
+from paper_tactics.entities.game_view_delta import GameViewDelta, PlayerViewDelta
 from paper_tactics.entities.player import Player
 from paper_tactics.entities.player_view import PlayerView
+from paper_tactics.entities.turn import Turn
 
 
 @dataclass
@@ -17,62 +30,141 @@ class Game:
     turns_left: int = 0
     active_player: Player = field(default_factory=Player)
     passive_player: Player = field(default_factory=Player)
-    trenches: frozenset[Cell] = frozenset()
+    trench_mask: int = 0
+    version: int = 0
+    # Turns made since the game was fetched
+    turns: list[Turn] = field(default_factory=list, compare=False, repr=False)
+    _views: dict[str, tuple[tuple[Any, ...], GameView]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    trenches = CellSet("trench_mask")
 
     def init(self) -> None:
         assert self.active_player.id != self.passive_player.id
         self._init_players()
-        self.trenches = frozenset(self._generate_trenches())
+        self.trench_mask = from_cells(self._generate_trenches())
+        self.rebuild_reachable_sets()
+        self.turns_left = self.preferences.turn_count
+
+    def rebuild_reachable_sets(self) -> None:
         self._rebuild_reachable_set(self.active_player, self.passive_player)
         self._rebuild_reachable_set(self.passive_player, self.active_player)
-        self.turns_left = self.preferences.turn_count
 
-    def get_view(self, player_id: str) -> GameView:
-        assert player_id in (self.active_player.id, self.passive_player.id)
-        if player_id == self.active_player.id:
-            me = self.active_player
-            opponent = self.passive_player
-        else:
-            me = self.passive_player
-            opponent = self.active_player
+    def clone(self) -> "Game":
+        return replace(
+            self,
+            active_player=self.active_player.clone(),
+            passive_player=self.passive_player.clone(),
+            turns=list(self.turns),
+        )
 
-        if self.preferences.is_visibility_applied and me.can_win and opponent.can_win:
-            opponent_units = opponent.units.intersection(me.visible_opponent)
-            opponent_walls = opponent.walls.intersection(me.visible_opponent)
-            trenches = self.trenches.intersection(me.visible_terrain)
-        else:
-            opponent_units = opponent.units
-            opponent_walls = opponent.walls
-            trenches = self.trenches
+    def get_view(self, player_id: str) -> GameView:
+        """Returns the view of the player, the same one until the game changes."""
+        me, opponent = self._get_players(player_id)
+        masks = self._get_view_masks(me, opponent)
+        key = (
+            masks,
+            self.turns_left,
+            me is self.active_player,
+            me.is_gone,
+            me.is_defeated,
+            opponent.is_gone,
+            opponent.is_defeated,
+            me.view_version,
+        )
+        if player_id in self._views:
+            cached_key, view = self._views[player_id]
+            if (
+                cached_key == key
+                and view.me.view_data == me.view_data
+                and view.opponent.view_data == opponent.view_data
+            ):
+                return view
 
-        return GameView(
+        _, _, _, opponent_units, opponent_walls, trenches = masks
+        view = GameView(
             id=self.id,
             turns_left=self.turns_left,
-            my_turn=(me == self.active_player),
+            my_turn=(me is self.active_player),
             me=PlayerView(
-                units=cast(frozenset[Cell], me.units),
-                walls=cast(frozenset[Cell], me.walls),
-                reachable=cast(frozenset[Cell], me.reachable),
+                units=me.units,
+                walls=me.walls,
+                reachable=me.reachable,
                 view_data=me.view_data.copy(),
                 is_gone=me.is_gone,
                 is_defeated=me.is_defeated,
             ),
             opponent=PlayerView(
-                units=cast(frozenset[Cell], opponent_units),
-                walls=cast(frozenset[Cell], opponent_walls),
+                units=to_cells(opponent_units),
+                walls=to_cells(opponent_walls),
                 reachable=frozenset(),
                 view_data=opponent.view_data.copy(),
                 is_gone=opponent.is_gone,
                 is_defeated=opponent.is_defeated,
             ),
-            trenches=trenches,
+            trenches=to_cells(trenches),
             preferences=self.preferences,
+            version=me.view_version + 1,
+        )
+        self._views[player_id] = key, view
+        return view
+
+    def get_view_update(self, player_id: str) -> Union[GameView, GameViewDelta]:
+        """Returns the changes since the last acknowledged view if they are smaller."""
+        me, opponent = self._get_players(player_id)
+        if not me.is_view_delta_enabled or not me.view_version:
+            return self.get_view(player_id)
+
+        masks = self._get_view_masks(me, opponent)
+        added = [new & ~old for new, old in zip(masks, me.acknowledged_view_masks)]
+        removed = [old & ~new for new, old in zip(masks, me.acknowledged_view_masks)]
+        if sum(map(count_cells, added + removed)) >= sum(map(count_cells, masks)):
+            return self.get_view(player_id)
+
+        return GameViewDelta(
+            id=self.id,
+            version=me.view_version + 1,
+            base_version=me.view_version,
+            turns_left=self.turns_left,
+            my_turn=(me is self.active_player),
+            me=PlayerViewDelta(
+                added_units=to_cells(added[0]),
+                removed_units=to_cells(removed[0]),
+                added_walls=to_cells(added[1]),
+                removed_walls=to_cells(removed[1]),
+                added_reachable=to_cells(added[2]),
+                removed_reachable=to_cells(removed[2]),
+                is_gone=me.is_gone,
+                is_defeated=me.is_defeated,
+            ),
+            opponent=PlayerViewDelta(
+                added_units=to_cells(added[3]),
+                removed_units=to_cells(removed[3]),
+                added_walls=to_cells(added[4]),
+                removed_walls=to_cells(removed[4]),
+                added_reachable=frozenset(),
+                removed_reachable=frozenset(),
+                is_gone=opponent.is_gone,
+                is_defeated=opponent.is_defeated,
+            ),
+            added_trenches=to_cells(added[5]),
+            removed_trenches=to_cells(removed[5]),
         )
 
-    def make_turn(self, player_id: str, cell: Cell) -> None:
+    def acknowledge_view(self, player_id: str) -> None:
+        """Records that the player has received the current view."""
+        me, opponent = self._get_players(player_id)
+        if me.is_view_delta_enabled:
+            me.view_version += 1
+            me.acknowledged_view_masks = self._get_view_masks(me, opponent)
+
+    def make_turn(
+        self, player_id: str, cell: Cell, game_bot: GameBot = GameBot()
+    ) -> None:
         if (
             player_id != self.active_player.id
-            or cell not in self.active_player.reachable
+            or not has_cell(self.active_player.reachable_mask, cell)
             or not all(
                 player.can_win for player in (self.active_player, self.passive_player)
             )
@@ -80,20 +172,28 @@ class Game:
             raise IllegalTurnException(self.id, player_id, cell)
 
         self._make_turn(cell, self.active_player, self.passive_player)
-        self._decrement_turns()
+        bot_cells = self._decrement_turns(game_bot)
+        self.turns.append(Turn(player_id, cell, bot_cells))
+
+    def replay_turn(self, turn: Turn) -> None:
+        """Makes the turn again, the bot making the same turns it made then."""
+        self.make_turn(
+            turn.player_id, turn.cell, _ReplayingGameBot(cells=list(turn.bot_cells))
+        )
 
-    def _decrement_turns(self) -> None:
+    def _decrement_turns(self, game_bot: GameBot) -> tuple[Cell, ...]:
+        bot_cells: list[Cell] = []
         self.turns_left -= 1
         if not self.turns_left:
             self.turns_left = self.preferences.turn_count
             if self.preferences.is_against_bot:
-                game_bot = GameBot()
                 for _ in range(self.preferences.turn_count):
-                    if not self.passive_player.reachable:
+                    if not self.passive_player.reachable_mask:
                         self.passive_player.is_defeated = True
                         break
                     cell = game_bot.make_turn(self.get_view(self.passive_player.id))
-                    assert cell in self.passive_player.reachable
+                    assert has_cell(self.passive_player.reachable_mask, cell)
+                    bot_cells.append(cell)
                     self._make_turn(cell, self.passive_player, self.active_player)
                     self.turns_left -= 1
                 self.turns_left = self.preferences.turn_count
@@ -102,58 +202,91 @@ class Game:
                     self.passive_player,
                     self.active_player,
                 )
-        if not self.active_player.reachable and not self.passive_player.is_defeated:
+        if (
+            not self.active_player.reachable_mask
+            and not self.passive_player.is_defeated
+        ):
             self.active_player.is_defeated = True
+        return tuple(bot_cells)
+
+    def _get_players(self, player_id: str) -> tuple[Player, Player]:
+        assert player_id in (self.active_player.id, self.passive_player.id)
+        if player_id == self.active_player.id:
+            return self.active_player, self.passive_player
+        return self.passive_player, self.active_player
+
+    def _get_view_masks(self, me: Player, opponent: Player) -> tuple[int, ...]:
+        if self.preferences.is_visibility_applied and me.can_win and opponent.can_win:
+            opponent_units = opponent.unit_mask & me.visible_opponent_mask
+            opponent_walls = opponent.wall_mask & me.visible_opponent_mask
+            trenches = self.trench_mask & me.visible_terrain_mask
+        else:
+            opponent_units = opponent.unit_mask
+            opponent_walls = opponent.wall_mask
+            trenches = self.trench_mask
+        return (
+            me.unit_mask,
+            me.wall_mask,
+            me.reachable_mask,
+            opponent_units,
+            opponent_walls,
+            trenches,
+        )
 
     def _make_turn(self, cell: Cell, player: Player, opponent: Player) -> None:
-        if cell in opponent.units:
-            opponent.units.remove(cell)
-            player.walls.add(cell)
+        bit = from_cell(cell)
+        if opponent.unit_mask & bit:
+            opponent.unit_mask ^= bit
+            player.wall_mask |= bit
             self._rebuild_reachable_set(opponent, player)
-        elif cell in self.trenches:
-            player.walls.add(cell)
-            opponent.reachable.discard(cell)
+        elif self.trench_mask & bit:
+            player.wall_mask |= bit
+            opponent.reachable_mask &= ~bit
         else:
-            player.units.add(cell)
-        self._rebuild_reachable_set(player, opponent)
+            player.unit_mask |= bit
+        self._extend_reachable_set(player, opponent, bit)
+
+    def _extend_reachable_set(self, player: Player, opponent: Player, bit: int) -> None:
+        # A new unit or wall can only connect more sources, so it is enough to
+        # add the neighbours of the wall component it touches. Everything the
+        # player has seen stays visible until the opponent loses it, which
+        # triggers a full rebuild of the player who can see it.
+        size = self.preferences.size
+        adjacent = get_adjacent(flood(bit, player.wall_mask), size)
+        if self.preferences.is_visibility_applied:
+            self._reveal(player, adjacent)
+        player.reachable_mask = (player.reachable_mask | adjacent) & ~(
+            player.unit_mask | player.wall_mask | opponent.wall_mask
+        )
 
     def _rebuild_reachable_set(self, player: Player, opponent: Player) -> None:
-        player.reachable.clear()
+        size = self.preferences.size
+        if self.preferences.is_visibility_applied:
+            player.visible_opponent_mask = (
+                player.visible_opponent_mask & (opponent.unit_mask | opponent.wall_mask)
+                | opponent.wall_mask & ~self.trench_mask
+            )
+        adjacent = get_adjacent(flood(player.unit_mask, player.wall_mask), size)
         if self.preferences.is_visibility_applied:
-            player.visible_opponent = {
-                cell
-                for cell in player.visible_opponent
-                if cell in opponent.units or cell in opponent.walls
-            }.union(cell for cell in opponent.walls if cell not in self.trenches)
-        sources = player.units.copy()
-        while True:
-            new_sources = set()
-            for source in sources:
-                for cell in self.preferences.get_adjacent_cells(source):
-                    if self.preferences.is_visibility_applied:
-                        player.visible_opponent.add(cell)
-                        if cell in self.trenches:
-                            player.visible_terrain.add(cell)
-                            player.visible_terrain.add(
-                                self.preferences.get_symmetric_cell(cell)
-                            )
-                    if cell in sources:
-                        continue
-                    if cell in player.walls:
-                        new_sources.add(cell)
-                    elif cell not in opponent.walls and cell not in player.units:
-                        player.reachable.add(cell)
-            if not new_sources:
-                break
-            sources.update(new_sources)
+            self._reveal(player, adjacent)
+        player.reachable_mask = adjacent & ~(
+            player.unit_mask | player.wall_mask | opponent.wall_mask
+        )
+
+    def _reveal(self, player: Player, cells: int) -> None:
+        player.visible_opponent_mask |= cells
+        trenches = cells & self.trench_mask
+        player.visible_terrain_mask |= trenches | get_symmetric(
+            trenches, self.preferences.size
+        )
 
     def _init_players(self) -> None:
         edge = self.preferences.size
-        self.active_player.units.add((1, 1))
-        self.passive_player.units.add((edge, edge))
+        self.active_player.unit_mask |= from_cell((1, 1))
+        self.passive_player.unit_mask |= from_cell((edge, edge))
         if self.preferences.is_double_base:
-            self.active_player.units.add((1, edge))
-            self.passive_player.units.add((edge, 1))
+            self.active_player.unit_mask |= from_cell((1, edge))
+            self.passive_player.unit_mask |= from_cell((edge, 1))
 
     def _generate_trenches(self) -> Iterable[Cell]:
         if not self.preferences.trench_density_percent:
@@ -164,13 +297,21 @@ class Game:
             for y in range(half):
                 if (
                     (y < half - 1 or x < half)
-                    and (x + 1, y + 1) not in self.active_player.units
-                    and (x + 1, y + 1) not in self.passive_player.units
+                    and not has_cell(self.active_player.unit_mask, (x + 1, y + 1))
+                    and not has_cell(self.passive_player.unit_mask, (x + 1, y + 1))
                     and randint(1, 100) <= self.preferences.trench_density_percent
                 ):
                     yield x + 1, y + 1
                     yield size - x, size - y
 
 
+@dataclass(frozen=True)
+class _ReplayingGameBot(GameBot):
+    cells: list[Cell] = field(default_factory=list)
+
+    def make_turn(self, game_view: GameView) -> Cell:
+        return self.cells.pop(0)
+
+
 class IllegalTurnException(Exception):
     pass
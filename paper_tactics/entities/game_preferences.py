@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Iterable
 
 from paper_tactics.entities.cell import Cell
@@ -31,13 +32,40 @@ class GamePreferences:
         return 1 <= x <= self.size and 1 <= y <= self.size
 
     def get_symmetric_cell(self, cell: Cell) -> Cell:
-        x, y = cell
-        s = self.size + 1
-        return s - x, s - y
+        symmetric_cell = _get_symmetric_cells(self.size).get(cell)
+        if symmetric_cell is None:
+            x, y = cell
+            s = self.size + 1
+            return s - x, s - y
+        return symmetric_cell
 
     def get_adjacent_cells(self, cell: Cell) -> Iterable[Cell]:
-        x, y = cell
-        for x_ in (x - 1, x, x + 1):
-            for y_ in (y - 1, y, y + 1):
-                if self.is_valid_cell((x_, y_)) and (x_ != x or y_ != y):
-                    yield x_, y_
+        adjacent_cells = _get_adjacent_cells(self.size).get(cell)
+        if adjacent_cells is None:
+            return tuple(_generate_adjacent_cells(cell, self.size))
+        return adjacent_cells
+
+
+@lru_cache(maxsize=None)
+def _get_adjacent_cells(size: int) -> dict[Cell, tuple[Cell, ...]]:
+    return {
+        (x, y): tuple(_generate_adjacent_cells((x, y), size))
+        for x in range(1, size + 1)
+        for y in range(1, size + 1)
+    }
+
+
+@lru_cache(maxsize=None)
+def _get_symmetric_cells(size: int) -> dict[Cell, Cell]:
+    s = size + 1
+    return {
+        (x, y): (s - x, s - y) for x in range(1, size + 1) for y in range(1, size + 1)
+    }
+
+
+def _generate_adjacent_cells(cell: Cell, size: int) -> Iterable[Cell]:
+    x, y = cell
+    for x_ in (x - 1, x, x + 1):
+        for y_ in (y - 1, y, y + 1):
+            if 1 <= x_ <= size and 1 <= y_ <= size and (x_ != x or y_ != y):
+                yield x_, y_
@@ -14,3 +14,4 @@ class GameView:
     opponent: PlayerView
     trenches: frozenset[Cell]
     preferences: GamePreferences
+    version: int
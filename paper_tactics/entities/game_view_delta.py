@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+
+from paper_tactics.entities.cell import Cell
+
+
+@dataclass(frozen=True)
+class PlayerViewDelta:
+    added_units: frozenset[Cell]
+    removed_units: frozenset[Cell]
+    added_walls: frozenset[Cell]
+    removed_walls: frozenset[Cell]
+    added_reachable: frozenset[Cell]
+    removed_reachable: frozenset[Cell]
+    is_gone: bool
+    is_defeated: bool
+
+
+@dataclass(frozen=True)
+class GameViewDelta:
+    id: str
+    version: int
+    base_version: int
+    turns_left: int
+    my_turn: bool
+    me: PlayerViewDelta
+    opponent: PlayerViewDelta
+    added_trenches: frozenset[Cell]
+    removed_trenches: frozenset[Cell]
@@ -8,3 +8,4 @@ class MatchRequest:
     id: str = ""
     view_data: dict[str, str] = field(default_factory=dict)
     game_preferences: GamePreferences = field(default_factory=GamePreferences)
+    is_view_delta_enabled: bool = False
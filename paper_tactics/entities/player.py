@@ -1,21 +1,33 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Final
 
-from paper_tactics.entities.cell import Cell
+from paper_tactics.entities.bitboard import CellSet
 
 
 @dataclass
 class Player:
     id: Final[str] = ""
-    units: set[Cell] = field(default_factory=set)
-    walls: set[Cell] = field(default_factory=set)
-    reachable: set[Cell] = field(default_factory=set)
-    visible_opponent: set[Cell] = field(default_factory=set)
-    visible_terrain: set[Cell] = field(default_factory=set)
+    unit_mask: int = 0
+    wall_mask: int = 0
+    reachable_mask: int = 0
+    visible_opponent_mask: int = 0
+    visible_terrain_mask: int = 0
     view_data: Final[dict[str, str]] = field(default_factory=dict)
     is_gone: bool = False
     is_defeated: bool = False
+    is_view_delta_enabled: bool = False
+    view_version: int = 0
+    acknowledged_view_masks: tuple[int, ...] = ()
+
+    units = CellSet("unit_mask")
+    walls = CellSet("wall_mask")
+    reachable = CellSet("reachable_mask")
+    visible_opponent = CellSet("visible_opponent_mask")
+    visible_terrain = CellSet("visible_terrain_mask")
 
     @property
     def can_win(self) -> bool:
         return not self.is_defeated and not self.is_gone
+
+    def clone(self) -> "Player":
+        return replace(self, view_data=self.view_data.copy())
@@ -0,0 +1,156 @@
+from dataclasses import dataclass, replace
+from math import log, sqrt
+from random import Random
+from time import monotonic
+from typing import Optional
+
+from paper_tactics.entities.bitboard import count_cells, from_cells, to_cells
+from paper_tactics.entities.cell import Cell
+from paper_tactics.entities.game import Game
+from paper_tactics.entities.game_bot import GameBot
+from paper_tactics.entities.game_view import GameView
+from paper_tactics.entities.player import Player
+
+_ME = "me"
+_OPPONENT = "opponent"
+
+
+@dataclass(frozen=True)
+class TreeSearchGameBot(GameBot):
+    """Monte Carlo tree search over the moves of the following turns.
+
+    Budgets are for a whole turn and are split evenly between its moves.
+    """
+
+    time_budget_in_ms: float = 200
+    playout_budget: int = 10000
+    playout_turn_count: int = 2
+    exploration_weight: float = 1.4
+    # The monotonic() time no search goes past, whatever the turns left
+    deadline: Optional[float] = None
+
+    def make_turn(self, game_view: GameView) -> Cell:
+        if len(game_view.me.reachable) == 1:
+            return next(iter(game_view.me.reachable))
+        statistics = self.search(game_view)
+        if not statistics:
+            return super().make_turn(game_view)
+        return max(statistics, key=lambda cell: (statistics[cell][0], cell))
+
+    def search(
+        self, game_view: GameView, seed: Optional[int] = None
+    ) -> dict[Cell, tuple[int, float]]:
+        """Returns the visit count and the total reward of every explored move."""
+        return self.search_game(simulate(game_view), seed)
+
+    def search_game(
+        self, game: Game, seed: Optional[int] = None
+    ) -> dict[Cell, tuple[int, float]]:
+        random = Random(seed)
+        root = _Node(game, random)
+        turn_count = game.preferences.turn_count
+        deadline = monotonic() + self.time_budget_in_ms / 1000 / turn_count
+        if self.deadline is not None:
+            deadline = min(deadline, self.deadline)
+        for _ in range(max(1, self.playout_budget // turn_count)):
+            if monotonic() >= deadline:
+                break
+            self._run_playout(root, game.clone(), random)
+        return {
+            cell: (child.visit_count, child.reward)
+            for cell, child in root.children.items()
+        }
+
+    def _run_playout(self, node: "_Node", game: Game, random: Random) -> None:
+        path = [node]
+        while not node.untried_cells and node.children:
+            cell, node = self._select(node)
+            game.make_turn(game.active_player.id, cell)
+            path.append(node)
+        if node.untried_cells:
+            cell = node.untried_cells.pop()
+            game.make_turn(game.active_player.id, cell)
+            node.children[cell] = _Node(game, random)
+            node = node.children[cell]
+            path.append(node)
+
+        reward = self._evaluate(game, random)
+        for node in path:
+            node.visit_count += 1
+            node.reward += reward
+
+    def _select(self, node: "_Node") -> tuple[Cell, "_Node"]:
+        log_visit_count = log(node.visit_count)
+
+        def get_score(cell: Cell) -> float:
+            child = node.children[cell]
+            mean = child.reward / child.visit_count
+            if node.player_id != _ME:
+                mean = 1 - mean
+            return mean + self.exploration_weight * sqrt(
+                log_visit_count / child.visit_count
+            )
+
+        cell = max(node.children, key=get_score)
+        return cell, node.children[cell]
+
+    def _evaluate(self, game: Game, random: Random) -> float:
+        move_count = self.playout_turn_count * game.preferences.turn_count
+        for _ in range(move_count):
+            if not game.active_player.can_win or not game.passive_player.can_win:
+                break
+            cell = random.choice(tuple(to_cells(game.active_player.reachable_mask)))
+            game.make_turn(game.active_player.id, cell)
+
+        if game.active_player.id == _ME:
+            me, opponent = game.active_player, game.passive_player
+        else:
+            me, opponent = game.passive_player, game.active_player
+        if not me.can_win:
+            return 0
+        if not opponent.can_win:
+            return 1
+        my_score = _get_score(me)
+        return my_score / (my_score + _get_score(opponent))
+
+
+class _Node:
+    __slots__ = "player_id", "untried_cells", "children", "visit_count", "reward"
+
+    def __init__(self, game: Game, random: Random):
+        self.player_id = game.active_player.id
+        self.untried_cells: list[Cell] = []
+        if game.active_player.can_win and game.passive_player.can_win:
+            self.untried_cells = sorted(to_cells(game.active_player.reachable_mask))
+            random.shuffle(self.untried_cells)
+        self.children: dict[Cell, _Node] = {}
+        self.visit_count = 0
+        self.reward = 0.0
+
+
+def simulate(game_view: GameView) -> Game:
+    """Recreates the game as seen by the player, with the player to move."""
+    game = Game(
+        preferences=replace(
+            game_view.preferences, is_against_bot=False, is_visibility_applied=False
+        ),
+        turns_left=game_view.turns_left,
+        active_player=Player(
+            _ME,
+            unit_mask=from_cells(game_view.me.units),
+            wall_mask=from_cells(game_view.me.walls),
+        ),
+        passive_player=Player(
+            _OPPONENT,
+            unit_mask=from_cells(game_view.opponent.units),
+            wall_mask=from_cells(game_view.opponent.walls),
+        ),
+        trench_mask=from_cells(game_view.trenches),
+    )
+    game.rebuild_reachable_sets()
+    game.active_player.reachable_mask = from_cells(game_view.me.reachable)
+    return game
+
+
+def _get_score(player: Player) -> int:
+    return 1 + count_cells(player.unit_mask | player.wall_mask | player.reachable_mask)
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+from paper_tactics.entities.cell import Cell
+
+
+@dataclass(frozen=True)
+class Turn:
+    player_id: str
+    cell: Cell
+    # The turns of the bot that followed, replayed as they were made
+    bot_cells: tuple[Cell, ...] = ()
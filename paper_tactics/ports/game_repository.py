@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Sequence
 
 from paper_tactics.entities.game import Game
 
@@ -6,12 +7,38 @@ from paper_tactics.entities.game import Game
 class GameRepository(ABC):
     @abstractmethod
     def store(self, game: Game) -> None:
-        ...
+        """Stores the game unless it has changed since it was fetched.
+
+        Increments the version of the game and clears its turns, raises
+        StaleGameException if the stored version is not the version of the
+        game.
+        """
+
+    def store_many(self, games: Sequence[Game]) -> None:
+        """Stores games that have never been stored, at once if possible.
+
+        Increments the versions of the games and clears their turns, new games
+        are expected to have ids of their own.
+        """
+        for game in games:
+            self.store(game)
 
     @abstractmethod
     def fetch(self, game_id: str) -> Game:
-        ...
+        """Returns the game without turns, as they were cleared once stored.
+
+        Repositories that cache games may return a game that is behind the
+        stored one without checking. Storing it then raises StaleGameException.
+        """
+
+    def fetch_version(self, game_id: str) -> int:
+        """Returns the version the game would be fetched with."""
+        return self.fetch(game_id).version
 
 
 class NoSuchGameException(Exception):
     pass
+
+
+class StaleGameException(Exception):
+    pass
@@ -13,3 +13,7 @@ class MatchRequestQueue(ABC):
     @abstractmethod
     def pop(self, game_preferences: GamePreferences) -> Optional[MatchRequest]:
         ...
+
+    @abstractmethod
+    def pop_many(self, max_count: int) -> list[MatchRequest]:
+        """Pops up to max_count requests, whatever their preferences."""
@@ -1,11 +1,23 @@
 from abc import ABC, abstractmethod
+from typing import Union
 
 from paper_tactics.entities.game_view import GameView
+from paper_tactics.entities.game_view_delta import GameViewDelta
 
 
 class PlayerNotifier(ABC):
     @abstractmethod
-    def notify(self, player_id: str, game_view: GameView) -> None:
+    def notify(
+        self, player_id: str, game_view: Union[GameView, GameViewDelta]
+    ) -> None:
+        ...
+
+
+class AsyncPlayerNotifier(ABC):
+    @abstractmethod
+    async def notify(
+        self, player_id: str, game_view: Union[GameView, GameViewDelta]
+    ) -> None:
         ...
 
 
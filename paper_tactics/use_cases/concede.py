@@ -1,10 +1,19 @@
-from paper_tactics.ports.game_repository import GameRepository, NoSuchGameException
+from typing import Optional
+
+from paper_tactics.entities.game import Game
+from paper_tactics.ports.game_repository import (
+    GameRepository,
+    NoSuchGameException,
+    StaleGameException,
+)
 from paper_tactics.ports.logger import Logger
-from paper_tactics.ports.player_notifier import PlayerNotifier
+from paper_tactics.ports.player_notifier import AsyncPlayerNotifier, PlayerNotifier
 from paper_tactics.use_cases.notify_player import (
     notify_active_player,
     notify_passive_player,
+    notify_players_async,
 )
+from paper_tactics.use_cases.store_game import store_notified_game, update_game
 
 
 def concede(
@@ -14,15 +23,40 @@ def concede(
     game_id: str,
     player_id: str,
 ) -> None:
-    try:
-        game = game_repository.fetch(game_id)
-    except NoSuchGameException as e:
-        return logger.log_exception(e)
-
-    for player in game.active_player, game.passive_player:
-        if player.id == player_id:
-            player.is_gone = True
+    game = _concede(game_repository, logger, game_id, player_id)
+    if not game:
+        return
 
     notify_active_player(player_notifier, game, logger)
     notify_passive_player(player_notifier, game, logger)
-    game_repository.store(game)
+    store_notified_game(game_repository, game, logger)
+
+
+async def concede_async(
+    game_repository: GameRepository,
+    player_notifier: AsyncPlayerNotifier,
+    logger: Logger,
+    game_id: str,
+    player_id: str,
+) -> None:
+    game = _concede(game_repository, logger, game_id, player_id)
+    if not game:
+        return
+
+    await notify_players_async(player_notifier, game, logger)
+    store_notified_game(game_repository, game, logger)
+
+
+def _concede(
+    game_repository: GameRepository, logger: Logger, game_id: str, player_id: str
+) -> Optional[Game]:
+    def leave(game: Game) -> None:
+        for player in game.active_player, game.passive_player:
+            if player.id == player_id:
+                player.is_gone = True
+
+    try:
+        return update_game(game_repository, game_id, leave)
+    except (NoSuchGameException, StaleGameException) as e:
+        logger.log_exception(e)
+        return None
@@ -1,17 +1,23 @@
-from typing import Optional
+import asyncio
+from typing import Final, Optional
 from uuid import uuid4
 
 from paper_tactics.entities.game import Game
+from paper_tactics.entities.game_preferences import GamePreferences
 from paper_tactics.entities.match_request import MatchRequest
 from paper_tactics.entities.player import Player
 from paper_tactics.ports.game_repository import GameRepository
 from paper_tactics.ports.logger import Logger
 from paper_tactics.ports.match_request_queue import MatchRequestQueue
-from paper_tactics.ports.player_notifier import PlayerNotifier
+from paper_tactics.ports.player_notifier import AsyncPlayerNotifier, PlayerNotifier
 from paper_tactics.use_cases.notify_player import (
     notify_active_player,
     notify_passive_player,
+    notify_player_async,
 )
+from paper_tactics.use_cases.store_game import store_notified_game
+
+MAX_REQUEST_COUNT: Final = 100
 
 
 def create_game(
@@ -21,9 +27,121 @@ def create_game(
     logger: Logger,
     request: MatchRequest,
 ) -> None:
-    if not request.game_preferences.valid:
+    game = _start_game(match_request_queue, request)
+    if not game:
         return
 
+    if not notify_active_player(player_notifier, game, logger):
+        return match_request_queue.put(request)
+
+    if notify_passive_player(player_notifier, game, logger):
+        game_repository.store(game)
+
+
+async def create_game_async(
+    game_repository: GameRepository,
+    match_request_queue: MatchRequestQueue,
+    player_notifier: AsyncPlayerNotifier,
+    logger: Logger,
+    request: MatchRequest,
+) -> None:
+    game = _start_game(match_request_queue, request)
+    if not game:
+        return
+
+    # Turns may reach the game as soon as anyone hears of it
+    game_repository.store(game)
+
+    # The queued player may be gone by now, the requesting player is only told
+    # about the game if the queued one is not.
+    if not await notify_player_async(player_notifier, game, logger, game.active_player):
+        match_request_queue.put(request)
+    elif not game.preferences.is_against_bot and not await notify_player_async(
+        player_notifier, game, logger, game.passive_player
+    ):
+        await notify_player_async(player_notifier, game, logger, game.active_player)
+    store_notified_game(game_repository, game, logger)
+
+
+async def create_games_async(
+    game_repository: GameRepository,
+    match_request_queue: MatchRequestQueue,
+    player_notifier: AsyncPlayerNotifier,
+    logger: Logger,
+    max_request_count: int = MAX_REQUEST_COUNT,
+) -> None:
+    """Pairs up to max_request_count queued requests at once.
+
+    Requests are paired with requests of the same preferences, a request left
+    without a pair is queued again. As in create_game_async, the request of a
+    player whose opponent is gone before hearing of the game is queued again.
+    """
+    requests_by_preferences: dict[GamePreferences, list[MatchRequest]] = {}
+    for request in match_request_queue.pop_many(max_request_count):
+        if request.game_preferences.valid:
+            requests_by_preferences.setdefault(request.game_preferences, []).append(
+                request
+            )
+
+    games: list[Game] = []
+    # The games of two players, by the request of the active player
+    paired_games: list[tuple[MatchRequest, Game]] = []
+    for preferences, requests in requests_by_preferences.items():
+        if preferences.is_against_bot:
+            games += (
+                _make_game(request, MatchRequest(game_preferences=preferences))
+                for request in requests
+            )
+            continue
+        if len(requests) % 2:
+            match_request_queue.put(requests.pop())
+        paired_games += (
+            (queued_request, _make_game(queued_request, request))
+            for queued_request, request in zip(requests[::2], requests[1::2])
+        )
+
+    # Passive players cannot make turns yet, so they hear of the games first
+    are_passive_players_here = await asyncio.gather(
+        *(
+            notify_player_async(player_notifier, game, logger, game.passive_player)
+            for _, game in paired_games
+        )
+    )
+    for (queued_request, game), is_passive_player_here in zip(
+        paired_games, are_passive_players_here
+    ):
+        if is_passive_player_here:
+            games.append(game)
+        else:
+            match_request_queue.put(queued_request)
+    if not games:
+        return
+
+    # Turns may reach the games as soon as the active players hear of them
+    game_repository.store_many(games)
+    are_active_players_here = await asyncio.gather(
+        *(
+            notify_player_async(player_notifier, game, logger, game.active_player)
+            for game in games
+        )
+    )
+    await asyncio.gather(
+        *(
+            notify_player_async(player_notifier, game, logger, game.passive_player)
+            for game, is_active_player_here in zip(games, are_active_players_here)
+            if not is_active_player_here and not game.preferences.is_against_bot
+        )
+    )
+    for game in games:
+        store_notified_game(game_repository, game, logger)
+
+
+def _start_game(
+    match_request_queue: MatchRequestQueue, request: MatchRequest
+) -> Optional[Game]:
+    if not request.game_preferences.valid:
+        return None
+
     queued_request: Optional[MatchRequest]
 
     if request.game_preferences.is_against_bot:
@@ -34,10 +152,22 @@ def create_game(
 
         if not queued_request or queued_request.id == request.id:
             match_request_queue.put(request)
-            return
+            return None
+
+    return _make_game(queued_request, request)
+
 
-    active_player = Player(id=queued_request.id, view_data=queued_request.view_data)
-    passive_player = Player(id=request.id, view_data=request.view_data)
+def _make_game(queued_request: MatchRequest, request: MatchRequest) -> Game:
+    active_player = Player(
+        id=queued_request.id,
+        view_data=queued_request.view_data,
+        is_view_delta_enabled=queued_request.is_view_delta_enabled,
+    )
+    passive_player = Player(
+        id=request.id,
+        view_data=request.view_data,
+        is_view_delta_enabled=request.is_view_delta_enabled,
+    )
     game = Game(
         id=uuid4().hex,
         active_player=active_player,
@@ -46,9 +176,4 @@ def create_game(
     )
 
     game.init()
-
-    if not notify_active_player(player_notifier, game, logger):
-        return match_request_queue.put(request)
-
-    if notify_passive_player(player_notifier, game, logger):
-        game_repository.store(game)
+    return game
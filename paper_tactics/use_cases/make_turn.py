@@ -1,11 +1,25 @@
+import asyncio
+from typing import Optional
+
 from paper_tactics.entities.cell import Cell
-from paper_tactics.entities.game import IllegalTurnException
-from paper_tactics.ports.game_repository import GameRepository, NoSuchGameException
+from paper_tactics.entities.game import Game, IllegalTurnException
+from paper_tactics.entities.game_bot import GameBot
+from paper_tactics.ports.game_repository import (
+    GameRepository,
+    NoSuchGameException,
+    StaleGameException,
+)
 from paper_tactics.ports.logger import Logger
-from paper_tactics.ports.player_notifier import PlayerNotifier
+from paper_tactics.ports.player_notifier import AsyncPlayerNotifier, PlayerNotifier
 from paper_tactics.use_cases.notify_player import (
     notify_active_player,
     notify_passive_player,
+    notify_players_async,
+)
+from paper_tactics.use_cases.store_game import (
+    store_notified_game,
+    update_game,
+    update_game_async,
 )
 
 
@@ -16,16 +30,11 @@ def make_turn(
     game_id: str,
     player_id: str,
     cell: Cell,
+    game_bot: GameBot = GameBot(),
 ) -> None:
-    try:
-        game = game_repository.fetch(game_id)
-    except NoSuchGameException as e:
-        return logger.log_exception(e)
-
-    try:
-        game.make_turn(player_id, cell)
-    except IllegalTurnException as e:
-        return logger.log_exception(e)
+    game = _make_turn(game_repository, logger, game_id, player_id, cell, game_bot)
+    if not game:
+        return
 
     if notify_active_player(player_notifier, game, logger):
         if not notify_passive_player(player_notifier, game, logger):
@@ -33,4 +42,52 @@ def make_turn(
     else:
         notify_passive_player(player_notifier, game, logger)
 
-    game_repository.store(game)
+    store_notified_game(game_repository, game, logger)
+
+
+async def make_turn_async(
+    game_repository: GameRepository,
+    player_notifier: AsyncPlayerNotifier,
+    logger: Logger,
+    game_id: str,
+    player_id: str,
+    cell: Cell,
+    game_bot: GameBot = GameBot(),
+) -> None:
+    async def update(game: Game) -> None:
+        if game.preferences.is_against_bot:
+            # Bots may search for long, the other players are served meanwhile
+            await asyncio.get_running_loop().run_in_executor(
+                None, game.make_turn, player_id, cell, game_bot
+            )
+        else:
+            game.make_turn(player_id, cell, game_bot)
+
+    try:
+        game = await update_game_async(game_repository, game_id, update)
+    except (NoSuchGameException, IllegalTurnException, StaleGameException) as e:
+        logger.log_exception(e)
+        return
+
+    await notify_players_async(player_notifier, game, logger)
+
+    store_notified_game(game_repository, game, logger)
+
+
+def _make_turn(
+    game_repository: GameRepository,
+    logger: Logger,
+    game_id: str,
+    player_id: str,
+    cell: Cell,
+    game_bot: GameBot,
+) -> Optional[Game]:
+    try:
+        return update_game(
+            game_repository,
+            game_id,
+            lambda game: game.make_turn(player_id, cell, game_bot),
+        )
+    except (NoSuchGameException, IllegalTurnException, StaleGameException) as e:
+        logger.log_exception(e)
+        return None
@@ -1,6 +1,13 @@
+import asyncio
+
 from paper_tactics.entities.game import Game
+from paper_tactics.entities.player import Player
 from paper_tactics.ports.logger import Logger
-from paper_tactics.ports.player_notifier import PlayerGoneException, PlayerNotifier
+from paper_tactics.ports.player_notifier import (
+    AsyncPlayerNotifier,
+    PlayerGoneException,
+    PlayerNotifier,
+)
 
 
 def notify_active_player(
@@ -10,12 +17,13 @@ def notify_active_player(
 ) -> bool:
     try:
         player_notifier.notify(
-            game.active_player.id, game.get_view(game.active_player.id)
+            game.active_player.id, game.get_view_update(game.active_player.id)
         )
     except PlayerGoneException as e:
         game.active_player.is_gone = True
         logger.log_exception(e)
         return False
+    game.acknowledge_view(game.active_player.id)
     return True
 
 
@@ -27,10 +35,61 @@ def notify_passive_player(
     if not game.preferences.is_against_bot:
         try:
             player_notifier.notify(
-                game.passive_player.id, game.get_view(game.passive_player.id)
+                game.passive_player.id, game.get_view_update(game.passive_player.id)
             )
         except PlayerGoneException as e:
             game.passive_player.is_gone = True
             logger.log_exception(e)
             return False
+        game.acknowledge_view(game.passive_player.id)
+    return True
+
+
+async def notify_players_async(
+    player_notifier: AsyncPlayerNotifier,
+    game: Game,
+    logger: Logger,
+) -> None:
+    """Notifies the players at once, then again the one whose opponent is gone."""
+    players = [game.active_player]
+    if not game.preferences.is_against_bot:
+        players.append(game.passive_player)
+    results = await asyncio.gather(
+        *(
+            player_notifier.notify(player.id, game.get_view_update(player.id))
+            for player in players
+        ),
+        return_exceptions=True,
+    )
+
+    # Views are acknowledged before anyone is marked gone, which changes them
+    for player, result in zip(players, results):
+        if result is None:
+            game.acknowledge_view(player.id)
+        elif not isinstance(result, PlayerGoneException):
+            raise result
+    for player, result in zip(players, results):
+        if isinstance(result, PlayerGoneException):
+            player.is_gone = True
+            logger.log_exception(result)
+
+    if len(players) == 2 and results.count(None) == 1:
+        await notify_player_async(
+            player_notifier, game, logger, players[results.index(None)]
+        )
+
+
+async def notify_player_async(
+    player_notifier: AsyncPlayerNotifier,
+    game: Game,
+    logger: Logger,
+    player: Player,
+) -> bool:
+    try:
+        await player_notifier.notify(player.id, game.get_view_update(player.id))
+    except PlayerGoneException as e:
+        player.is_gone = True
+        logger.log_exception(e)
+        return False
+    game.acknowledge_view(player.id)
     return True
@@ -0,0 +1,97 @@
+from typing import Awaitable, Callable, Final
+
+from paper_tactics.entities.game import Game, IllegalTurnException
+from paper_tactics.ports.game_repository import (
+    GameRepository,
+    NoSuchGameException,
+    StaleGameException,
+)
+from paper_tactics.ports.logger import Logger
+
+MAX_ATTEMPT_COUNT: Final = 5
+
+
+def update_game(
+    game_repository: GameRepository, game_id: str, update: Callable[[Game], None]
+) -> Game:
+    """Fetches, updates and stores the game, again if it has changed meanwhile.
+
+    A turn that is illegal in a fetched game which is behind the stored one, as
+    cached games may be, is made again in the stored game.
+    """
+    attempt_count = 0
+    while True:
+        attempt_count += 1
+        game = game_repository.fetch(game_id)
+        try:
+            update(game)
+        except IllegalTurnException:
+            if not _is_behind(game_repository, game, attempt_count):
+                raise
+            continue
+        try:
+            game_repository.store(game)
+            return game
+        except StaleGameException:
+            if attempt_count == MAX_ATTEMPT_COUNT:
+                raise
+
+
+async def update_game_async(
+    game_repository: GameRepository,
+    game_id: str,
+    update: Callable[[Game], Awaitable[None]],
+) -> Game:
+    """Same as update_game, but the update is awaited."""
+    attempt_count = 0
+    while True:
+        attempt_count += 1
+        game = game_repository.fetch(game_id)
+        try:
+            await update(game)
+        except IllegalTurnException:
+            if not _is_behind(game_repository, game, attempt_count):
+                raise
+            continue
+        try:
+            game_repository.store(game)
+            return game
+        except StaleGameException:
+            if attempt_count == MAX_ATTEMPT_COUNT:
+                raise
+
+
+def store_notified_game(
+    game_repository: GameRepository, game: Game, logger: Logger
+) -> None:
+    """Stores the players who are gone and the views the players have received.
+
+    If the game has changed meanwhile, the players who are gone are marked in
+    the stored game and the others get a full view next time.
+    """
+    players = game.active_player, game.passive_player
+    if not any(player.is_gone or player.is_view_delta_enabled for player in players):
+        return
+
+    def update(stored_game: Game) -> None:
+        for stored_player in stored_game.active_player, stored_game.passive_player:
+            for player in players:
+                if player.id == stored_player.id:
+                    stored_player.is_gone |= player.is_gone
+                    stored_player.view_version = 0
+                    stored_player.acknowledged_view_masks = ()
+
+    try:
+        game_repository.store(game)
+    except StaleGameException:
+        try:
+            update_game(game_repository, game.id, update)
+        except (NoSuchGameException, StaleGameException) as e:
+            logger.log_exception(e)
+
+
+def _is_behind(game_repository: GameRepository, game: Game, attempt_count: int) -> bool:
+    return (
+        attempt_count < MAX_ATTEMPT_COUNT
+        and game_repository.fetch_version(game.id) != game.version
+    )
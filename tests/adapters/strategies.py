@@ -1,17 +1,27 @@
 import os
 
 import boto3
-from hypothesis.strategies import composite, integers, text
+from hypothesis.strategies import characters, composite, integers, text
 
 from paper_tactics.adapters.dynamodb_game_repository import DynamodbGameRepository
 from paper_tactics.adapters.dynamodb_match_request_queue import (
     DynamodbMatchRequestQueue,
 )
+from paper_tactics.adapters.dynamodb_turn_log_game_repository import (
+    DynamodbTurnLogGameRepository,
+)
 
 
 @composite
 def dynamodb_match_request_queues(draw) -> DynamodbMatchRequestQueue:
-    return DynamodbMatchRequestQueue(*draw(_dynamodb_tables()))
+    return DynamodbMatchRequestQueue(
+        *draw(
+            _dynamodb_tables(
+                index_name=DynamodbMatchRequestQueue.INDEX_NAME,
+                index_key=DynamodbMatchRequestQueue.PREFERENCES_KEY,
+            )
+        )
+    )
 
 
 @composite
@@ -20,14 +30,76 @@ def dynamodb_game_repositories(draw) -> DynamodbGameRepository:
 
 
 @composite
-def _dynamodb_tables(draw):
-    table_name = draw(text(min_size=3))
-    key = draw(text(min_size=1))
-    ttl_key = draw(text(min_size=1))
-    ttl_in_seconds = draw(integers(min_value=0, max_value=10**10))
+def dynamodb_turn_log_game_repositories(draw) -> DynamodbTurnLogGameRepository:
+    return paged_latest_first(
+        DynamodbTurnLogGameRepository(
+            *draw(
+                _dynamodb_tables(
+                    range_key=DynamodbTurnLogGameRepository.VERSION_KEY,
+                    # Items read back after they expire are treated as gone
+                    min_ttl_in_seconds=60,
+                )
+            )
+        )
+    )
+
+
+def paged_latest_first(
+    game_repository: DynamodbTurnLogGameRepository,
+) -> DynamodbTurnLogGameRepository:
+    """Pages descending queries of the repository from the latest items, as
+    DynamoDB does.
 
-    if key == ttl_key:
-        ttl_key = "_" + key
+    The mocked table applies Limit before it orders the items, so a descending
+    page would hold the earliest ones. The queries are made without Limit and
+    paged here instead.
+    """
+    table = game_repository._table
+    query = table.query
+    key_names = [game_repository._key, game_repository.VERSION_KEY]
+
+    def query_latest_first(**kwargs):
+        if kwargs.get("ScanIndexForward", True) or "Limit" not in kwargs:
+            return query(**kwargs)
+        limit = kwargs.pop("Limit")
+        start_key = kwargs.pop("ExclusiveStartKey", None)
+        projection = kwargs.pop("ProjectionExpression", None)
+        attribute_names = kwargs.pop("ExpressionAttributeNames", {})
+        items = query(**kwargs)["Items"]
+        if start_key is not None:
+            keys = [{name: item[name] for name in key_names} for item in items]
+            items = items[keys.index(start_key) + 1 :]
+        page = {"Items": items[:limit]}
+        if len(items) > limit:
+            page["LastEvaluatedKey"] = {
+                name: items[limit - 1][name] for name in key_names
+            }
+        if projection is not None:
+            names = [attribute_names[name.strip()] for name in projection.split(",")]
+            page["Items"] = [
+                {name: item[name] for name in names if name in item}
+                for item in page["Items"]
+            ]
+        return page
+
+    table.query = query_latest_first
+    return game_repository
+
+
+@composite
+def _dynamodb_tables(
+    draw, index_name=None, index_key=None, range_key=None, min_ttl_in_seconds=0
+):
+    table_name = draw(text(min_size=3))
+    # Prefixes keep the keys apart from each other and from item attributes
+    # Key conditions would read dots and brackets in the key as paths
+    key = "$" + draw(
+        text(characters(blacklist_characters=".[]", blacklist_categories=("Cs",)))
+        if range_key
+        else text()
+    )
+    ttl_key = "%" + draw(text())
+    ttl_in_seconds = draw(integers(min_value=min_ttl_in_seconds, max_value=10**10))
 
     os.environ["AWS_DEFAULT_REGION"] = "eu-central-1"
 
@@ -38,21 +110,51 @@ def _dynamodb_tables(draw):
     except client.exceptions.ResourceNotFoundException:
         pass
 
-    client.create_table(
-        TableName=table_name,
-        KeySchema=[
-            {
-                "AttributeName": key,
-                "KeyType": "HASH",
-            }
-        ],
-        AttributeDefinitions=[
+    attribute_definitions = [
+        {
+            "AttributeName": key,
+            "AttributeType": "S",
+        }
+    ]
+    key_schema = [
+        {
+            "AttributeName": key,
+            "KeyType": "HASH",
+        }
+    ]
+    if range_key:
+        attribute_definitions.append({"AttributeName": range_key, "AttributeType": "N"})
+        key_schema.append({"AttributeName": range_key, "KeyType": "RANGE"})
+    indexes = {}
+    if index_name:
+        # The index orders by the TTL attribute, as the match request queue does
+        attribute_definitions += [
             {
-                "AttributeName": key,
+                "AttributeName": index_key,
                 "AttributeType": "S",
+            },
+            {
+                "AttributeName": ttl_key,
+                "AttributeType": "N",
+            },
+        ]
+        indexes["GlobalSecondaryIndexes"] = [
+            {
+                "IndexName": index_name,
+                "KeySchema": [
+                    {"AttributeName": index_key, "KeyType": "HASH"},
+                    {"AttributeName": ttl_key, "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "KEYS_ONLY"},
             }
-        ],
+        ]
+
+    client.create_table(
+        TableName=table_name,
+        KeySchema=key_schema,
+        AttributeDefinitions=attribute_definitions,
         BillingMode="PAY_PER_REQUEST",
+        **indexes,
     )
 
     return table_name, key, ttl_key, ttl_in_seconds
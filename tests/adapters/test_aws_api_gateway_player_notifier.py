@@ -0,0 +1,28 @@
+import os
+
+from hypothesis import given
+from hypothesis.strategies import integers, sampled_from
+
+from paper_tactics.adapters.aws_api_gateway_player_notifier import (
+    AwsApiGatewayPlayerNotifier,
+)
+
+endpoint_urls = sampled_from(
+    ["https://a.execute-api.eu-central-1.amazonaws.com/rolling", "http://localhost"]
+)
+
+
+@given(endpoint_urls, integers(min_value=1, max_value=3))
+def test_client_is_reused_for_the_same_endpoint(endpoint_url, max_pool_connections):
+    os.environ["AWS_DEFAULT_REGION"] = "eu-central-1"
+
+    player_notifier = AwsApiGatewayPlayerNotifier(endpoint_url, max_pool_connections)
+    other_player_notifier = AwsApiGatewayPlayerNotifier(
+        endpoint_url, max_pool_connections
+    )
+
+    assert player_notifier._client is other_player_notifier._client
+    assert player_notifier._client.meta.endpoint_url == endpoint_url
+    assert (
+        player_notifier._client.meta.config.max_pool_connections == max_pool_connections
+    )
@@ -0,0 +1,9 @@
+from hypothesis import given
+
+from paper_tactics.adapters.game_codec import decode_game, encode_game
+from tests.entities.strategies import games
+
+
+@given(games())
+def test_game_is_not_changed_if_encoded_and_decoded(game):
+    assert decode_game(encode_game(game)) == game
@@ -1,13 +1,95 @@
-from hypothesis import given
-from hypothesis.strategies import text
+import asyncio
+from contextlib import contextmanager
+from dataclasses import asdict
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import time
+from unittest.mock import patch
+
+from hypothesis import assume, given, settings
+from hypothesis.strategies import integers, lists, text
 from moto import mock_dynamodb
 from pytest import raises
 
+from paper_tactics.adapters.caching_game_repository import CachingGameRepository
+from paper_tactics.adapters.dynamodb_turn_log_game_repository import (
+    DynamodbTurnLogGameRepository,
+)
+from paper_tactics.adapters.file_game_repository import (
+    FileGameRepository,
+    _encode_record,
+)
 from paper_tactics.adapters.in_memory_game_repository import InMemoryGameRepository
-from paper_tactics.ports.game_repository import NoSuchGameException
-from tests.adapters.strategies import dynamodb_game_repositories
+from paper_tactics.adapters.sharded_game_repository import (
+    ShardedGameRepository,
+    get_game_repository_handlers,
+    get_shard_index,
+)
+from paper_tactics.adapters.unix_socket_rpc import RpcClient, serve
+from paper_tactics.entities.bitboard import to_cells
+from paper_tactics.entities.game import Game
+from paper_tactics.ports.game_repository import (
+    NoSuchGameException,
+    StaleGameException,
+)
+from tests.adapters.strategies import (
+    dynamodb_game_repositories,
+    dynamodb_turn_log_game_repositories,
+    paged_latest_first,
+)
 from tests.entities.strategies import games
 
+# The repository blocks while calling, so the shards are served from elsewhere
+_shard_loop = asyncio.new_event_loop()
+Thread(target=_shard_loop.run_forever, daemon=True).start()
+
+
+@contextmanager
+def _file_game_repository(directory=None, max_log_size=1024):
+    with TemporaryDirectory() as temporary_directory:
+        game_repository = FileGameRepository(
+            directory or temporary_directory, max_log_size
+        )
+        try:
+            yield game_repository
+        finally:
+            game_repository.close()
+
+
+@contextmanager
+def _sharded_game_repository(shard_games, shard_count=2):
+    with TemporaryDirectory() as directory:
+        servers = []
+        shards = []
+        for index in range(shard_count):
+            game_repository = InMemoryGameRepository()
+            shard_games.append(game_repository._games)
+            address = f"{directory}/{index}.sock"
+            servers.append(
+                asyncio.run_coroutine_threadsafe(
+                    serve(address, get_game_repository_handlers(game_repository)),
+                    _shard_loop,
+                ).result()
+            )
+            shards.append(RpcClient(address))
+        try:
+            yield ShardedGameRepository(shards)
+        finally:
+            for shard in shards:
+                shard.close()
+            for server in servers:
+                _shard_loop.call_soon_threadsafe(server.close)
+
+
+class _UnreachableGameRepository(InMemoryGameRepository):
+    """Stores games, but fails if they are fetched."""
+
+    def fetch(self, game_id: str) -> Game:
+        raise AssertionError(game_id)
+
+    def fetch_version(self, game_id: str) -> int:
+        raise AssertionError(game_id)
+
 
 def _test_game_is_not_changed_if_written_and_read_back(game_repository, game):
     game_repository.store(game)
@@ -22,6 +104,40 @@ def _test_no_such_game_exception_is_thrown_if_game_does_not_exist(
         game_repository.fetch(game_id)
 
 
+def _test_stale_game_is_not_stored(game_repository, game):
+    game_repository.store(game)
+    stale_game = game_repository.fetch(game.id)
+    game_repository.store(game_repository.fetch(game.id))
+
+    with raises(StaleGameException):
+        game_repository.store(stale_game)
+
+
+def _test_new_games_are_stored_at_once(game_repository, new_games):
+    game_repository.store_many(new_games)
+
+    for game in new_games:
+        assert game.version == 1
+        assert game_repository.fetch(game.id) == game
+
+
+def _test_turns_are_cleared_once_stored(game_repository, game):
+    game_repository.store(game)
+    for _ in range(3):
+        game = game_repository.fetch(game.id)
+        assert not game.turns
+        if game.active_player.can_win and game.passive_player.can_win:
+            game.make_turn(game.active_player.id, min(game.active_player.reachable))
+        game_repository.store(game)
+        assert not game.turns
+
+
+@mock_dynamodb
+@given(dynamodb_game_repositories(), games())
+def test_stale_game_is_not_stored_in_dynamodb(game_repository, game):
+    _test_stale_game_is_not_stored(game_repository, game)
+
+
 @mock_dynamodb
 @given(dynamodb_game_repositories(), games())
 def test_game_is_not_changed_if_written_and_read_back_in_dynamodb(
@@ -30,6 +146,41 @@ def test_game_is_not_changed_if_written_and_read_back_in_dynamodb(
     _test_game_is_not_changed_if_written_and_read_back(game_repository, game)
 
 
+@mock_dynamodb
+@given(dynamodb_game_repositories(), games())
+def test_game_stored_in_legacy_format_is_read_from_dynamodb(game_repository, game):
+    def serialize_player(player):
+        return {
+            "id": player.id,
+            "units": list(player.units),
+            "walls": list(player.walls),
+            "reachable": list(player.reachable),
+            "visible_opponent": list(player.visible_opponent),
+            "visible_terrain": list(player.visible_terrain),
+            "is_gone": player.is_gone,
+            "is_defeated": player.is_defeated,
+            "view_data": player.view_data,
+            "is_view_delta_enabled": player.is_view_delta_enabled,
+            "view_version": player.view_version,
+            "acknowledged_view": [
+                list(to_cells(mask)) for mask in player.acknowledged_view_masks
+            ],
+        }
+
+    game_repository._table.put_item(
+        Item={
+            game_repository._key: game.id,
+            "turns-left": game.turns_left,
+            "active-player": serialize_player(game.active_player),
+            "passive-player": serialize_player(game.passive_player),
+            "preferences": asdict(game.preferences),
+            "trenches": list(game.trenches),
+        }
+    )
+
+    assert game_repository.fetch(game.id) == game
+
+
 @mock_dynamodb
 @given(dynamodb_game_repositories(), text(min_size=1))
 def test_no_such_game_exception_is_thrown_if_game_does_not_exist_in_dynamodb(
@@ -40,13 +191,395 @@ def test_no_such_game_exception_is_thrown_if_game_does_not_exist_in_dynamodb(
     )
 
 
+@mock_dynamodb
+@given(dynamodb_game_repositories(), games())
+def test_turns_are_cleared_once_stored_in_dynamodb(game_repository, game):
+    _test_turns_are_cleared_once_stored(game_repository, game)
+
+
 @given(games())
 def test_game_is_not_changed_if_written_and_read_back_in_memory(game):
     _test_game_is_not_changed_if_written_and_read_back(InMemoryGameRepository(), game)
 
 
+@given(games())
+def test_stale_game_is_not_stored_in_memory(game):
+    _test_stale_game_is_not_stored(InMemoryGameRepository(), game)
+
+
 @given(text())
 def test_no_such_game_exception_is_thrown_if_game_does_not_exist_in_memory(game_id):
     _test_no_such_game_exception_is_thrown_if_game_does_not_exist(
         InMemoryGameRepository(), game_id
     )
+
+
+@given(games())
+def test_turns_are_cleared_once_stored_in_memory(game):
+    _test_turns_are_cleared_once_stored(InMemoryGameRepository(), game)
+
+
+@given(games())
+def test_stored_game_is_not_shared_with_callers_in_memory(game):
+    game_repository = InMemoryGameRepository()
+    game_repository.store(game)
+    game.active_player.is_gone = True
+    game_repository.fetch(game.id).passive_player.is_gone = True
+
+    stored_game = game_repository.fetch(game.id)
+    assert not stored_game.active_player.is_gone
+    assert not stored_game.passive_player.is_gone
+
+
+@given(games())
+def test_game_is_not_changed_if_written_and_read_back_with_cache(game):
+    _test_game_is_not_changed_if_written_and_read_back(
+        CachingGameRepository(InMemoryGameRepository()), game
+    )
+
+
+@mock_dynamodb
+@given(dynamodb_game_repositories(), games())
+def test_stale_game_is_not_stored_in_dynamodb_with_cache(game_repository, game):
+    _test_stale_game_is_not_stored(CachingGameRepository(game_repository), game)
+
+
+@given(games())
+def test_turns_are_cleared_once_stored_with_cache(game):
+    _test_turns_are_cleared_once_stored(
+        CachingGameRepository(InMemoryGameRepository()), game
+    )
+
+
+@given(games())
+def test_cached_game_is_fetched_without_the_other_repository(game):
+    caching_game_repository = CachingGameRepository(_UnreachableGameRepository())
+    caching_game_repository.store(game)
+
+    assert caching_game_repository.fetch(game.id) == game
+    assert caching_game_repository.hit_count == 1
+
+
+@given(games())
+def test_cached_game_is_forgotten_once_it_is_changed_elsewhere(game):
+    game_repository = InMemoryGameRepository()
+    caching_game_repository = CachingGameRepository(game_repository)
+    caching_game_repository.store(game)
+
+    changed_game = game_repository.fetch(game.id)
+    changed_game.active_player.is_gone = True
+    game_repository.store(changed_game)
+
+    # The game is served behind, as the other repository is not asked
+    cached_game = caching_game_repository.fetch(game.id)
+    assert cached_game.version < changed_game.version
+    assert not cached_game.active_player.is_gone
+    with raises(StaleGameException):
+        caching_game_repository.store(cached_game)
+    assert caching_game_repository.fetch(game.id) == changed_game
+    assert caching_game_repository.miss_count == 1
+
+
+@given(games(), games())
+def test_least_recently_used_game_is_evicted_from_cache(game, other_game):
+    assume(game.id != other_game.id)
+    caching_game_repository = CachingGameRepository(
+        InMemoryGameRepository(), max_size=1
+    )
+    caching_game_repository.store(game)
+    caching_game_repository.store(other_game)
+
+    caching_game_repository.fetch(game.id)
+    caching_game_repository.fetch(game.id)
+
+    assert caching_game_repository.miss_count == 1
+    assert caching_game_repository.hit_count == 1
+
+
+@given(games())
+def test_game_is_not_changed_if_written_and_read_back_in_shards(game):
+    with _sharded_game_repository([]) as game_repository:
+        _test_game_is_not_changed_if_written_and_read_back(game_repository, game)
+
+
+@given(games())
+def test_stale_game_is_not_stored_in_shards(game):
+    with _sharded_game_repository([]) as game_repository:
+        _test_stale_game_is_not_stored(game_repository, game)
+
+
+@given(games())
+def test_turns_are_cleared_once_stored_in_shards(game):
+    with _sharded_game_repository([]) as game_repository:
+        _test_turns_are_cleared_once_stored(game_repository, game)
+
+
+@mock_dynamodb
+@given(
+    dynamodb_game_repositories(),
+    lists(games(), max_size=30, unique_by=lambda game: game.id),
+)
+def test_new_games_are_stored_at_once_in_dynamodb(game_repository, new_games):
+    _test_new_games_are_stored_at_once(game_repository, new_games)
+
+
+@given(lists(games(), max_size=5, unique_by=lambda game: game.id))
+def test_new_games_are_stored_at_once_with_cache(new_games):
+    _test_new_games_are_stored_at_once(
+        CachingGameRepository(InMemoryGameRepository()), new_games
+    )
+
+
+@given(lists(games(), max_size=5, unique_by=lambda game: game.id))
+def test_new_games_are_stored_at_once_in_shards(new_games):
+    with _sharded_game_repository([]) as game_repository:
+        _test_new_games_are_stored_at_once(game_repository, new_games)
+
+
+@given(text())
+def test_no_such_game_exception_is_thrown_if_game_does_not_exist_in_shards(game_id):
+    with _sharded_game_repository([]) as game_repository:
+        _test_no_such_game_exception_is_thrown_if_game_does_not_exist(
+            game_repository, game_id
+        )
+
+
+@given(games(), integers(min_value=1, max_value=4))
+def test_game_is_kept_only_in_the_shard_its_id_hashes_to(game, shard_count):
+    shard_games = []
+    with _sharded_game_repository(shard_games, shard_count) as game_repository:
+        game_repository.store(game)
+
+    assert [game.id in games for games in shard_games] == [
+        index == get_shard_index(game.id, shard_count) for index in range(shard_count)
+    ]
+
+
+@given(games())
+def test_game_is_not_changed_if_written_and_read_back_in_files(game):
+    with _file_game_repository() as game_repository:
+        _test_game_is_not_changed_if_written_and_read_back(game_repository, game)
+
+
+@given(games())
+def test_stale_game_is_not_stored_in_files(game):
+    with _file_game_repository() as game_repository:
+        _test_stale_game_is_not_stored(game_repository, game)
+
+
+@given(games())
+def test_turns_are_cleared_once_stored_in_files(game):
+    with _file_game_repository() as game_repository:
+        _test_turns_are_cleared_once_stored(game_repository, game)
+
+
+@given(lists(games(), max_size=5, unique_by=lambda game: game.id), integers(0, 4096))
+def test_flushed_games_are_recovered_from_files(new_games, max_log_size):
+    with TemporaryDirectory() as directory:
+        with _file_game_repository(directory, max_log_size) as game_repository:
+            for game in new_games:
+                game_repository.store(game)
+            game_repository.flush()
+            for game in new_games:
+                game_repository.store(game)
+            game_repository.flush()
+            for game in new_games:
+                game_repository.store(game_repository.fetch(game.id))
+
+        with _file_game_repository(directory, max_log_size) as game_repository:
+            for game in new_games:
+                assert game_repository.fetch_version(game.id) == 2
+                assert game_repository.fetch(game.id) == game
+
+
+@given(games())
+def test_torn_record_is_dropped_from_files(game):
+    with TemporaryDirectory() as directory:
+        with _file_game_repository(directory, max_log_size=2**20) as game_repository:
+            game_repository.store(game)
+            game_repository.flush()
+            game_repository.store(game)
+            game_repository.flush()
+        with open(f"{directory}/games.log", "r+b") as log:
+            log.truncate(log.seek(0, 2) - 1)
+
+        with _file_game_repository(directory) as game_repository:
+            assert game_repository.fetch_version(game.id) == 1
+
+
+@given(lists(games(), min_size=1, max_size=5, unique_by=lambda game: game.id))
+def test_games_are_stored_while_files_are_compacted(new_games):
+    with TemporaryDirectory() as directory:
+        with _file_game_repository(directory, max_log_size=0) as game_repository:
+            for game in new_games:
+                game_repository.store(game)
+            is_game_stored = False
+
+            def encode_record(game):
+                nonlocal is_game_stored
+                if not is_game_stored:
+                    is_game_stored = True
+                    assert not game_repository._lock.locked()
+                    game_repository.store(game_repository.fetch(new_games[0].id))
+                return _encode_record(game)
+
+            with patch(
+                "paper_tactics.adapters.file_game_repository._encode_record",
+                encode_record,
+            ):
+                game_repository.flush()
+            assert is_game_stored
+            game_repository.flush()
+
+        with _file_game_repository(directory) as game_repository:
+            assert [game_repository.fetch_version(game.id) for game in new_games] == [
+                2
+            ] + [1] * (len(new_games) - 1)
+
+
+@mock_dynamodb
+@given(dynamodb_turn_log_game_repositories(), games())
+def test_game_is_not_changed_if_written_and_read_back_in_turn_log(
+    game_repository, game
+):
+    _test_game_is_not_changed_if_written_and_read_back(game_repository, game)
+
+
+@mock_dynamodb
+@given(dynamodb_turn_log_game_repositories(), games())
+def test_stale_game_is_not_stored_in_turn_log(game_repository, game):
+    _test_stale_game_is_not_stored(game_repository, game)
+
+
+@mock_dynamodb
+@given(dynamodb_turn_log_game_repositories(), games())
+def test_turns_are_cleared_once_stored_in_turn_log(game_repository, game):
+    _test_turns_are_cleared_once_stored(game_repository, game)
+
+
+@mock_dynamodb
+@given(dynamodb_turn_log_game_repositories(), text(min_size=1))
+def test_no_such_game_exception_is_thrown_if_game_does_not_exist_in_turn_log(
+    game_repository, game_id
+):
+    _test_no_such_game_exception_is_thrown_if_game_does_not_exist(
+        game_repository, game_id
+    )
+
+
+@mock_dynamodb
+@settings(deadline=None)
+@given(dynamodb_turn_log_game_repositories(), games(), integers(0, 40))
+def test_game_is_replayed_from_its_turns_in_turn_log(game_repository, game, turn_count):
+    game_repository.store(game)
+    for _ in range(turn_count):
+        game = game_repository.fetch(game.id)
+        if not game.active_player.can_win or not game.passive_player.can_win:
+            break
+        game.make_turn(game.active_player.id, min(game.active_player.reachable))
+        game.acknowledge_view(game.active_player.id)
+        game_repository.store(game)
+    game = game_repository.fetch(game.id)
+    game.passive_player.is_gone = True
+    game_repository.store(game)
+
+    # Another repository knows the game only from the log
+    other_game_repository = _other_turn_log_game_repository(game_repository)
+    assert other_game_repository.fetch(game.id) == game
+    assert other_game_repository.fetch_version(game.id) == game.version
+    items = game_repository._table.scan()["Items"]
+    assert all("events" in item for item in items if item["version"] % 16 > 1)
+
+
+@mock_dynamodb
+@settings(deadline=None)
+@given(dynamodb_turn_log_game_repositories(), games())
+def test_game_is_checkpointed_before_its_checkpoint_expires_in_turn_log(
+    game_repository, game
+):
+    game_repository.store(game)
+    game = game_repository.fetch(game.id)
+    _expire_item(game_repository, game, game.version, expiration_time=int(time()) + 5)
+    # The other repository has not fetched the game since the checkpoint
+    other_game_repository = _other_turn_log_game_repository(game_repository)
+    game = other_game_repository.fetch(game.id)
+    game.passive_player.is_gone = True
+    other_game_repository.store(game)
+
+    item = _get_item(game_repository, game, game.version)
+    assert "game" in item
+    assert item[game_repository._ttl_key] > game_repository.get_expiration_time()
+    assert game_repository.fetch(game.id) == game
+
+
+@mock_dynamodb
+@settings(deadline=None)
+@given(dynamodb_turn_log_game_repositories(), games())
+def test_no_such_game_exception_is_thrown_if_checkpoint_expired_in_turn_log(
+    game_repository, game
+):
+    game_repository.store(game)
+    game = game_repository.fetch(game.id)
+    game.passive_player.is_gone = True
+    game_repository.store(game)
+    assert "events" in _get_item(game_repository, game, game.version)
+    # DynamoDB may still return the checkpoint some time after it expires
+    _expire_item(game_repository, game, game.version - 1, expiration_time=0)
+
+    with raises(NoSuchGameException):
+        _other_turn_log_game_repository(game_repository).fetch(game.id)
+
+
+@mock_dynamodb
+@settings(deadline=None)
+@given(dynamodb_turn_log_game_repositories(), dynamodb_game_repositories(), games())
+def test_game_is_moved_from_legacy_game_repository_to_turn_log(
+    game_repository, legacy_game_repository, game
+):
+    assume(game_repository._table.name != legacy_game_repository._table.name)
+    legacy_game_repository.store(game)
+    game_repository = _other_turn_log_game_repository(
+        game_repository, legacy_game_repository=legacy_game_repository
+    )
+
+    assert game_repository.fetch_version(game.id) == game.version
+    assert game_repository.fetch(game.id) == game
+    game.passive_player.is_gone = True
+    game_repository.store(game)
+
+    assert "game" in _get_item(game_repository, game, game.version)
+    assert _other_turn_log_game_repository(game_repository).fetch(game.id) == game
+    assert legacy_game_repository.fetch_version(game.id) == game.version - 1
+
+
+def _other_turn_log_game_repository(
+    game_repository: DynamodbTurnLogGameRepository, **kwargs
+) -> DynamodbTurnLogGameRepository:
+    return paged_latest_first(
+        DynamodbTurnLogGameRepository(
+            game_repository._table.name,
+            game_repository._key,
+            game_repository._ttl_key,
+            game_repository._ttl_in_seconds,
+            **kwargs,
+        )
+    )
+
+
+def _get_item(
+    game_repository: DynamodbTurnLogGameRepository, game: Game, version: int
+) -> dict:
+    return game_repository._table.get_item(
+        Key={game_repository._key: game.id, game_repository.VERSION_KEY: version}
+    )["Item"]
+
+
+def _expire_item(
+    game_repository: DynamodbTurnLogGameRepository,
+    game: Game,
+    version: int,
+    expiration_time: int,
+) -> None:
+    item = _get_item(game_repository, game, version)
+    item[game_repository._ttl_key] = expiration_time
+    game_repository._table.put_item(Item=item)
@@ -0,0 +1,74 @@
+import json
+from dataclasses import asdict
+
+from hypothesis import given
+
+from paper_tactics.adapters.game_view_encoder import (
+    BITMASK_HEADER,
+    BITMASK_LENGTH,
+    BITMASK_VIEW,
+    encode_bitmask,
+    encode_json,
+)
+from paper_tactics.entities.bitboard import to_cells
+from tests.entities.strategies import games
+
+
+@given(games())
+def test_json_is_the_same_as_of_asdict(game):
+    for player in game.active_player, game.passive_player:
+        view = game.get_view(player.id)
+        assert _load_json(encode_json(view)) == _load_json(
+            json.dumps(asdict(view), default=list)
+        )
+        game.acknowledge_view(player.id)
+        player.is_view_delta_enabled = True
+
+    for player in game.active_player, game.passive_player:
+        view_update = game.get_view_update(player.id)
+        assert _load_json(encode_json(view_update)) == _load_json(
+            json.dumps(asdict(view_update), default=list)
+        )
+
+
+@given(games())
+def test_bitmask_has_the_cells_of_the_view(game):
+    view = game.get_view(game.passive_player.id)
+    data = encode_bitmask(view)
+
+    _, kind, flags, turns_left, version, _ = BITMASK_HEADER.unpack_from(data)
+    masks = [
+        to_cells(int.from_bytes(data[start : start + BITMASK_LENGTH], "little"))
+        for start in range(
+            BITMASK_HEADER.size,
+            BITMASK_HEADER.size + 6 * BITMASK_LENGTH,
+            BITMASK_LENGTH,
+        )
+    ]
+    tail = json.loads(data[BITMASK_HEADER.size + 6 * BITMASK_LENGTH :])
+
+    assert kind == BITMASK_VIEW
+    assert flags & 1 == view.my_turn
+    assert turns_left == view.turns_left
+    assert version == view.version
+    assert masks == [
+        view.me.units,
+        view.me.walls,
+        view.me.reachable,
+        view.opponent.units,
+        view.opponent.walls,
+        view.trenches,
+    ]
+    assert tail["preferences"] == asdict(view.preferences)
+    assert tail["me"]["view_data"] == view.me.view_data
+
+
+def _load_json(source):
+    def sort_cells(value):
+        if isinstance(value, list):
+            return sorted(value)
+        return value
+
+    return json.loads(
+        source, object_hook=lambda o: {k: sort_cells(v) for k, v in o.items()}
+    )
@@ -1,6 +1,13 @@
-from hypothesis import given
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+from hypothesis import assume, given, settings
+from hypothesis.strategies import integers, lists
 from moto import mock_dynamodb
 
+from paper_tactics.adapters.dynamodb_match_request_queue import (
+    DynamodbMatchRequestQueue,
+)
 from paper_tactics.adapters.in_memory_match_request_queue import (
     InMemoryMatchRequestQueue,
 )
@@ -19,6 +26,37 @@ def _test_request_is_popped_after_stored_and_read_back(queue, request):
     assert queue.pop(request.game_preferences) is None
 
 
+def _test_only_request_with_same_preferences_is_popped(queue, request, other):
+    assume(request.game_preferences != other.game_preferences)
+    queue.put(replace(other, id="*" + request.id))
+    queue.put(request)
+
+    assert queue.pop(request.game_preferences) == request
+    assert queue.pop(request.game_preferences) is None
+
+
+def _test_requests_are_popped_at_once(queue, requests, max_count):
+    for request in requests:
+        queue.put(request)
+
+    popped_requests = queue.pop_many(max_count)
+    remaining_requests = queue.pop_many(len(requests))
+
+    assert len(popped_requests) == min(max_count, len(requests))
+    assert sorted(popped_requests + remaining_requests, key=repr) == sorted(
+        requests, key=repr
+    )
+    assert queue.pop_many(len(requests)) == []
+
+
+@mock_dynamodb
+@given(dynamodb_match_request_queues(), match_requests(), match_requests())
+def test_only_request_with_same_preferences_is_popped_in_dynamodb(
+    queue, request, other
+):
+    _test_only_request_with_same_preferences_is_popped(queue, request, other)
+
+
 @mock_dynamodb
 @given(dynamodb_match_request_queues(), game_preferences())
 def test_pop_on_empty_queue_returns_none_in_dynamodb(queue, preferences):
@@ -31,13 +69,126 @@ def test_request_is_popped_after_stored_and_read_back_in_dynamodb(queue, request
     _test_request_is_popped_after_stored_and_read_back(queue, request)
 
 
+@mock_dynamodb
+@given(
+    dynamodb_match_request_queues(),
+    lists(match_requests(), max_size=8, unique_by=lambda request: request.id),
+    integers(min_value=0, max_value=10),
+)
+def test_requests_are_popped_at_once_in_dynamodb(queue, requests, max_count):
+    _test_requests_are_popped_at_once(queue, requests, max_count)
+
+
+@mock_dynamodb
+@given(dynamodb_match_request_queues(), match_requests(), match_requests())
+def test_requests_queued_without_preferences_are_popped_at_once_in_dynamodb(
+    queue, request, other
+):
+    assume(request.game_preferences != other.game_preferences)
+    legacy_request = replace(request, id="*" + request.id)
+    legacy_other = replace(other, id="**" + request.id)
+    for queued_request in request, legacy_request, legacy_other:
+        queue.put(queued_request)
+    # As they were queued before pairing in bulk
+    for queued_request in legacy_request, legacy_other:
+        queue._table.update_item(
+            Key={queue._key: queued_request.id},
+            UpdateExpression="REMOVE game_preferences",
+        )
+
+    assert sorted(queue.pop_many(3), key=repr) == sorted(
+        [request, legacy_request], key=repr
+    )
+    assert queue.pop(other.game_preferences) == legacy_other
+
+
+@given(
+    lists(match_requests(), max_size=8, unique_by=lambda request: request.id),
+    integers(min_value=0, max_value=10),
+)
+def test_requests_are_popped_at_once_in_memory(requests, max_count):
+    _test_requests_are_popped_at_once(InMemoryMatchRequestQueue(), requests, max_count)
+
+
 @given(game_preferences())
 def test_pop_on_empty_queue_returns_none_in_memory(preferences):
     _test_pop_on_empty_queue_returns_none(InMemoryMatchRequestQueue(), preferences)
 
 
+@given(match_requests(), match_requests())
+def test_only_request_with_same_preferences_is_popped_in_memory(request, other):
+    _test_only_request_with_same_preferences_is_popped(
+        InMemoryMatchRequestQueue(), request, other
+    )
+
+
 @given(match_requests())
 def test_request_is_popped_after_stored_and_read_back_in_memory(request):
     _test_request_is_popped_after_stored_and_read_back(
         InMemoryMatchRequestQueue(), request
     )
+
+
+@given(match_requests(), match_requests())
+def test_requests_are_popped_in_order_in_memory(request, other):
+    queue = InMemoryMatchRequestQueue()
+    other = replace(
+        other, id="*" + request.id, game_preferences=request.game_preferences
+    )
+    queue.put(request)
+    queue.put(other)
+
+    assert queue.pop(request.game_preferences) == request
+    assert queue.pop(request.game_preferences) == other
+
+
+@given(match_requests())
+def test_removed_request_is_not_popped_in_memory(request):
+    queue = InMemoryMatchRequestQueue()
+    queue.put(request)
+    queue.remove(request.id)
+    queue.remove(request.id)
+
+    assert queue.pop(request.game_preferences) is None
+
+
+@given(match_requests())
+def test_expired_request_is_not_popped_in_memory(request):
+    queue = InMemoryMatchRequestQueue(ttl_in_seconds=0)
+    queue.put(request)
+
+    assert queue.pop(request.game_preferences) is None
+
+
+@mock_dynamodb
+@settings(max_examples=5, deadline=None)
+@given(dynamodb_match_request_queues(), match_requests())
+def test_concurrently_popped_requests_are_popped_once_in_dynamodb(queue, request):
+    request_count = 40
+    thread_count = 8
+    for i in range(request_count):
+        queue.put(replace(request, id=f"{i}{request.id}"))
+    # Every thread stands for a separate Lambda with its own connection
+    queues = [
+        DynamodbMatchRequestQueue(
+            queue._table.name, queue._key, queue._ttl_key, queue._ttl_in_seconds
+        )
+        for _ in range(thread_count)
+    ]
+
+    def pop_all(queue):
+        popped_requests = []
+        while popped_request := queue.pop(request.game_preferences):
+            popped_requests.append(popped_request)
+        return popped_requests
+
+    with ThreadPoolExecutor(thread_count) as executor:
+        popped_ids = [
+            popped_request.id
+            for popped_requests in executor.map(pop_all, queues)
+            for popped_request in popped_requests
+        ]
+
+    assert sorted(popped_ids) == sorted(
+        f"{i}{request.id}" for i in range(request_count)
+    )
@@ -0,0 +1,20 @@
+from hypothesis import assume, given, settings
+from hypothesis.strategies import integers
+
+from paper_tactics.adapters.process_pool_game_bot import ProcessPoolGameBot
+from tests.entities.strategies import games
+
+
+@settings(max_examples=20, deadline=None)
+@given(games(), integers())
+def test_parallel_search_is_deterministic_within_playout_budget(game, seed):
+    assume(game.active_player.can_win and game.passive_player.can_win)
+    game_bot = ProcessPoolGameBot(
+        time_budget_in_ms=10**6, playout_budget=40, worker_count=2
+    )
+    game_view = game.get_view(game.active_player.id)
+
+    statistics = game_bot.search(game_view, seed)
+
+    assert set(statistics).issubset(game.active_player.reachable)
+    assert statistics == game_bot.search(game_view, seed)
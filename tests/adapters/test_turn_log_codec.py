@@ -0,0 +1,29 @@
+from hypothesis import given
+
+from paper_tactics.adapters.turn_log_codec import encode_events, replay_events
+from tests.entities.strategies import games
+
+
+@given(games())
+def test_game_is_not_changed_if_its_events_are_encoded_and_replayed(game):
+    # As fetched, without the turns that made it
+    game.turns.clear()
+    stored_game = game.clone()
+    if game.active_player.can_win and game.passive_player.can_win:
+        game.make_turn(game.active_player.id, min(game.active_player.reachable))
+    game.acknowledge_view(game.passive_player.id)
+    game.active_player.is_gone = True
+
+    events = encode_events(stored_game, game)
+    assert events is not None
+    replay_events(stored_game, events)
+
+    assert stored_game == game
+
+
+@given(games())
+def test_events_are_not_encoded_if_they_do_not_replay_to_the_game(game):
+    stored_game = game.clone()
+    game.active_player.view_data = {**game.active_player.view_data, "*": ""}
+
+    assert encode_events(stored_game, game) is None
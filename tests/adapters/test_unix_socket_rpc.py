@@ -0,0 +1,38 @@
+import asyncio
+from tempfile import TemporaryDirectory
+
+import pytest
+from hypothesis import given, settings
+from hypothesis.strategies import lists, text
+
+from paper_tactics.adapters.unix_socket_rpc import RpcClient, serve
+from paper_tactics.ports.player_notifier import PlayerGoneException
+
+
+@settings(deadline=None)
+@given(lists(text()), text())
+def test_concurrent_calls_are_answered_over_one_connection(values, player_id):
+    async def echo(index, value):
+        # The calls made first are answered last
+        await asyncio.sleep((len(values) - index) / 1000)
+        return value
+
+    async def notify(player_id):
+        raise PlayerGoneException(player_id)
+
+    async def run():
+        with TemporaryDirectory() as directory:
+            address = f"{directory}/shard.sock"
+            async with await serve(address, {"echo": echo, "notify": notify}):
+                client = RpcClient(address)
+                assert values == await asyncio.gather(
+                    *(
+                        client.call_async("echo", index, value)
+                        for index, value in enumerate(values)
+                    )
+                )
+                with pytest.raises(PlayerGoneException):
+                    await client.call_async("notify", player_id)
+                client.close()
+
+    asyncio.run(run())
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from hypothesis import given
+from hypothesis.strategies import integers
+from websockets.exceptions import ConnectionClosed
+
+from paper_tactics.adapters.game_view_encoder import encode_json
+from paper_tactics.adapters.websockets_player_notifier import (
+    WebsocketsAsyncPlayerNotifier,
+)
+from paper_tactics.ports.player_notifier import PlayerGoneException
+from tests.entities.strategies import games
+
+
+class SlowWebsocket:
+    def __init__(self):
+        self.closed = False
+        self.messages = []
+        self.is_readable = asyncio.Event()
+
+    async def send(self, message):
+        await self.is_readable.wait()
+        if self.closed:
+            raise ConnectionClosed(None, None)
+        self.messages.append(message)
+
+    async def close(self, code=1000, reason=""):
+        self.closed = True
+        self.is_readable.set()
+
+
+@given(games(), integers(min_value=1, max_value=4))
+def test_messages_are_sent_in_order_before_notifying_returns(game, message_count):
+    async def run():
+        player_notifier = WebsocketsAsyncPlayerNotifier()
+        websocket = SlowWebsocket()
+        player_notifier.websockets[game.active_player.id] = websocket
+        game_view = game.get_view(game.active_player.id)
+
+        notifications = [
+            asyncio.ensure_future(
+                player_notifier.notify(game.active_player.id, game_view)
+            )
+            for _ in range(message_count)
+        ]
+        await asyncio.sleep(0)
+        assert not any(notification.done() for notification in notifications)
+
+        websocket.is_readable.set()
+        await asyncio.gather(*notifications)
+        assert websocket.messages == [encode_json(game_view)] * message_count
+
+    asyncio.run(run())
+
+
+@given(games(), integers(min_value=1, max_value=4))
+def test_player_is_gone_if_too_many_messages_are_pending(
+    game, max_queued_message_count
+):
+    async def run():
+        player_notifier = WebsocketsAsyncPlayerNotifier(max_queued_message_count)
+        websocket = SlowWebsocket()
+        player_notifier.websockets[game.active_player.id] = websocket
+        game_view = game.get_view(game.active_player.id)
+
+        notifications = [
+            asyncio.ensure_future(
+                player_notifier.notify(game.active_player.id, game_view)
+            )
+            for _ in range(max_queued_message_count)
+        ]
+        await asyncio.sleep(0)
+        with pytest.raises(PlayerGoneException):
+            await player_notifier.notify(game.active_player.id, game_view)
+        await player_notifier.join()
+
+        assert websocket.closed
+        assert game.active_player.id not in player_notifier.websockets
+        # The pending messages are never received
+        results = await asyncio.gather(*notifications, return_exceptions=True)
+        assert all(isinstance(result, PlayerGoneException) for result in results)
+
+    asyncio.run(run())
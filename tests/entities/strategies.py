@@ -36,12 +36,17 @@ def match_requests(draw, **kwargs) -> MatchRequest:
         id=draw(text(min_size=1)),
         view_data=draw(dictionaries(text(), text())),
         game_preferences=draw(game_preferences(**kwargs)),
+        is_view_delta_enabled=draw(booleans()),
     )
 
 
 @composite
 def players(draw) -> Player:
-    return Player(draw(text(min_size=1)), view_data=draw(dictionaries(text(), text())))
+    return Player(
+        draw(text(min_size=1)),
+        view_data=draw(dictionaries(text(), text())),
+        is_view_delta_enabled=draw(booleans()),
+    )
 
 
 @composite
@@ -84,4 +89,7 @@ def games(draw, shallow=False, is_visibility_applied=None, is_against_bot=None)
         turn = reachable[draw(integers(min_value=0, max_value=len(reachable) - 1))]
         game.make_turn(game.active_player.id, turn)
 
+        if not shallow and draw(booleans()):
+            game.acknowledge_view(game.active_player.id)
+
     return game
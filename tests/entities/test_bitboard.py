@@ -0,0 +1,41 @@
+from hypothesis import given
+from hypothesis.strategies import composite, integers, sets, tuples
+
+from paper_tactics.entities.bitboard import (
+    from_cells,
+    get_adjacent,
+    get_symmetric,
+    to_cells,
+)
+from paper_tactics.entities.game_preferences import GamePreferences
+
+
+@composite
+def boards(draw):
+    preferences = GamePreferences(size=draw(integers(min_value=2, max_value=12)))
+    coordinates = integers(min_value=1, max_value=preferences.size)
+    return preferences, draw(sets(tuples(coordinates, coordinates)))
+
+
+@given(boards())
+def test_cells_are_not_changed_if_converted_to_bitboard_and_back(board):
+    _, cells = board
+    assert to_cells(from_cells(cells)) == cells
+
+
+@given(boards())
+def test_adjacent_bitboard_matches_adjacent_cells(board):
+    preferences, cells = board
+    assert to_cells(get_adjacent(from_cells(cells), preferences.size)) == {
+        adjacent_cell
+        for cell in cells
+        for adjacent_cell in preferences.get_adjacent_cells(cell)
+    }
+
+
+@given(boards())
+def test_symmetric_bitboard_matches_symmetric_cells(board):
+    preferences, cells = board
+    assert to_cells(get_symmetric(from_cells(cells), preferences.size)) == {
+        preferences.get_symmetric_cell(cell) for cell in cells
+    }
@@ -1,5 +1,9 @@
-from hypothesis import given
+from dataclasses import replace
 
+from hypothesis import assume, given
+from hypothesis.strategies import booleans, data, sampled_from
+
+from paper_tactics.entities.game_view_delta import GameViewDelta
 from tests.entities.strategies import games
 
 
@@ -73,3 +77,64 @@ def test_invisible_cells_are_unreachable(game):
 def test_reachable_cells_are_visible(game):
     for player in game.active_player, game.passive_player:
         assert not player.reachable.difference(player.visible_opponent)
+
+
+@given(games())
+def test_players_match_full_rebuild_of_reachable_sets(game):
+    players = game.active_player, game.passive_player
+    for player, opponent in zip(players, reversed(players)):
+        rebuilt_player = replace(player)
+        game._rebuild_reachable_set(rebuilt_player, opponent)
+        assert rebuilt_player == player
+
+
+@given(games(), data())
+def test_view_delta_applied_to_acknowledged_view_gives_current_view(game, data):
+    assume(game.active_player.can_win and game.passive_player.can_win)
+    previous_views = {}
+    for player in game.active_player, game.passive_player:
+        player.is_view_delta_enabled = True
+        previous_views[player.id] = game.get_view(player.id)
+        game.acknowledge_view(player.id)
+
+    cell = data.draw(sampled_from(sorted(game.active_player.reachable)))
+    game.make_turn(game.active_player.id, cell)
+
+    for player_id, previous_view in previous_views.items():
+        view = game.get_view(player_id)
+        delta = game.get_view_update(player_id)
+        if not isinstance(delta, GameViewDelta):
+            assert delta == view
+            continue
+        assert delta.base_version == previous_view.version
+        assert delta.version == view.version
+        for previous, current, player_delta in (
+            (previous_view.me, view.me, delta.me),
+            (previous_view.opponent, view.opponent, delta.opponent),
+        ):
+            assert current.units == previous.units.difference(
+                player_delta.removed_units
+            ).union(player_delta.added_units)
+            assert current.walls == previous.walls.difference(
+                player_delta.removed_walls
+            ).union(player_delta.added_walls)
+            assert current.reachable == previous.reachable.difference(
+                player_delta.removed_reachable
+            ).union(player_delta.added_reachable)
+        assert view.trenches == previous_view.trenches.difference(
+            delta.removed_trenches
+        ).union(delta.added_trenches)
+
+
+@given(games(), data())
+def test_view_is_reused_until_game_changes(game, data):
+    assume(game.active_player.can_win and game.passive_player.can_win)
+    player_id = game.passive_player.id
+    view = game.get_view(player_id)
+    assert game.get_view(player_id) is view
+
+    cell = data.draw(sampled_from(sorted(game.active_player.reachable)))
+    game.make_turn(game.active_player.id, cell)
+    game.passive_player.is_gone = data.draw(booleans())
+
+    assert game.get_view(player_id) == game.clone().get_view(player_id)
@@ -0,0 +1,15 @@
+from hypothesis import given
+
+from paper_tactics.entities.game_bot import GameBot
+from tests.entities.strategies import games
+
+
+@given(games())
+def test_weights_of_all_reachable_cells_match_weights_of_single_cells(game):
+    game_bot = GameBot()
+    for player in game.active_player, game.passive_player:
+        game_view = game.get_view(player.id)
+        assert game_bot._get_weights(game_view) == {
+            cell: game_bot._get_weight(cell, game_view)
+            for cell in game_view.me.reachable
+        }
@@ -0,0 +1,44 @@
+from time import monotonic
+
+from hypothesis import assume, given
+from hypothesis.strategies import integers
+
+from paper_tactics.entities.tree_search_game_bot import TreeSearchGameBot
+from tests.entities.strategies import games
+
+
+@given(games(), integers(min_value=1, max_value=50))
+def test_explored_cells_are_reachable(game, playout_budget):
+    assume(game.active_player.can_win and game.passive_player.can_win)
+    game_bot = TreeSearchGameBot(playout_budget=playout_budget)
+
+    statistics = game_bot.search(game.get_view(game.active_player.id))
+
+    assert statistics
+    assert set(statistics).issubset(game.active_player.reachable)
+    assert sum(visit_count for visit_count, _ in statistics.values()) <= max(
+        1, playout_budget // game.preferences.turn_count
+    )
+
+
+@given(games(is_against_bot=True))
+def test_tree_search_bot_makes_a_whole_turn(game):
+    game_bot = TreeSearchGameBot(playout_budget=20)
+
+    for _ in range(game.turns_left):
+        if not game.active_player.can_win or not game.passive_player.can_win:
+            return
+        cell = min(game.active_player.reachable)
+        game.make_turn(game.active_player.id, cell, game_bot)
+
+    assert game.turns_left == game.preferences.turn_count
+
+
+@given(games())
+def test_nothing_is_explored_past_deadline(game):
+    assume(game.active_player.can_win and game.passive_player.can_win)
+    game_bot = TreeSearchGameBot(time_budget_in_ms=10**6, deadline=monotonic())
+
+    statistics = game_bot.search(game.get_view(game.active_player.id))
+
+    assert not statistics
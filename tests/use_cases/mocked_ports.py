@@ -1,14 +1,22 @@
-from dataclasses import replace
-from typing import Iterable, Optional
+from typing import Callable, Iterable, Optional, Union
 
 from paper_tactics.entities.game import Game
 from paper_tactics.entities.game_preferences import GamePreferences
 from paper_tactics.entities.game_view import GameView
+from paper_tactics.entities.game_view_delta import GameViewDelta
 from paper_tactics.entities.match_request import MatchRequest
-from paper_tactics.ports.game_repository import GameRepository, NoSuchGameException
+from paper_tactics.ports.game_repository import (
+    GameRepository,
+    NoSuchGameException,
+    StaleGameException,
+)
 from paper_tactics.ports.logger import Logger
 from paper_tactics.ports.match_request_queue import MatchRequestQueue
-from paper_tactics.ports.player_notifier import PlayerGoneException, PlayerNotifier
+from paper_tactics.ports.player_notifier import (
+    AsyncPlayerNotifier,
+    PlayerGoneException,
+    PlayerNotifier,
+)
 
 
 class MockedMatchRequestQueue(MatchRequestQueue):
@@ -31,6 +39,11 @@ class MockedMatchRequestQueue(MatchRequestQueue):
             self.requests.remove(queued_request)
         return queued_request
 
+    def pop_many(self, max_count: int) -> list[MatchRequest]:
+        popped_requests = self.requests[:max_count]
+        del self.requests[:max_count]
+        return popped_requests
+
 
 class MockedPlayerNotifier(PlayerNotifier):
     def __init__(self, active_player_is_gone: bool, passive_player_is_gone: bool):
@@ -38,8 +51,29 @@ class MockedPlayerNotifier(PlayerNotifier):
         self.passive_player_is_gone = passive_player_is_gone
         self.notified_player_ids: list[str] = []
 
-    def notify(self, player_id: str, game_view: GameView) -> None:
+    def notify(self, player_id: str, game_view: Union[GameView, GameViewDelta]) -> None:
+        self.notified_player_ids.append(player_id)
+        if (
+            self.active_player_is_gone
+            and game_view.my_turn
+            or self.passive_player_is_gone
+            and not game_view.my_turn
+        ):
+            raise PlayerGoneException(player_id)
+
+
+class MockedAsyncPlayerNotifier(AsyncPlayerNotifier):
+    def __init__(self, active_player_is_gone: bool, passive_player_is_gone: bool):
+        self.active_player_is_gone = active_player_is_gone
+        self.passive_player_is_gone = passive_player_is_gone
+        self.notified_player_ids: list[str] = []
+        self.game_views: list[Union[GameView, GameViewDelta]] = []
+
+    async def notify(
+        self, player_id: str, game_view: Union[GameView, GameViewDelta]
+    ) -> None:
         self.notified_player_ids.append(player_id)
+        self.game_views.append(game_view)
         if (
             self.active_player_is_gone
             and game_view.my_turn
@@ -54,7 +88,11 @@ class MockedGameRepository(GameRepository):
         self.stored_games = stored_games or {}
 
     def store(self, game: Game) -> None:
-        self.stored_games[game.id] = replace(game)
+        stored_game = self.stored_games.get(game.id)
+        if (stored_game.version if stored_game else 0) != game.version:
+            raise StaleGameException(game.id)
+        game.version += 1
+        self.stored_games[game.id] = game.clone()
 
     def fetch(self, game_id: str) -> Game:
         if game_id in self.stored_games:
@@ -62,6 +100,47 @@ class MockedGameRepository(GameRepository):
         raise NoSuchGameException(game_id)
 
 
+class MockedConcurrentGameRepository(GameRepository):
+    """Changes the stored game right before the first store of the game."""
+
+    def __init__(self, game: Game, change: Callable[[Game], None]):
+        self.stored_games = {game.id: game.clone()}
+        self._change: Optional[Callable[[Game], None]] = change
+
+    def store(self, game: Game) -> None:
+        stored_game = self.stored_games[game.id]
+        if self._change:
+            self._change(stored_game)
+            stored_game.version += 1
+            self._change = None
+        if stored_game.version != game.version:
+            raise StaleGameException(game.id)
+        game.version += 1
+        self.stored_games[game.id] = game.clone()
+
+    def fetch(self, game_id: str) -> Game:
+        if game_id in self.stored_games:
+            return self.stored_games[game_id].clone()
+        raise NoSuchGameException(game_id)
+
+
+class MockedBehindGameRepository(MockedGameRepository):
+    """Fetches an older game until its version is fetched, as caches may."""
+
+    def __init__(self, game: Game, older_game: Game):
+        super().__init__({game.id: game.clone()})
+        self._older_game: Optional[Game] = older_game
+
+    def fetch(self, game_id: str) -> Game:
+        if self._older_game:
+            return self._older_game.clone()
+        return super().fetch(game_id).clone()
+
+    def fetch_version(self, game_id: str) -> int:
+        self._older_game = None
+        return super().fetch_version(game_id)
+
+
 class MockedLogger(Logger):
     def __init__(self):
         self.log = []
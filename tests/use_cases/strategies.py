@@ -1,7 +1,11 @@
 from hypothesis.strategies import booleans, composite, iterables
 
 from tests.entities.strategies import match_requests
-from tests.use_cases.mocked_ports import MockedMatchRequestQueue, MockedPlayerNotifier
+from tests.use_cases.mocked_ports import (
+    MockedAsyncPlayerNotifier,
+    MockedMatchRequestQueue,
+    MockedPlayerNotifier,
+)
 
 
 @composite
@@ -12,3 +16,8 @@ def match_request_queues(draw) -> MockedMatchRequestQueue:
 @composite
 def player_notifiers(draw) -> MockedPlayerNotifier:
     return MockedPlayerNotifier(draw(booleans()), draw(booleans()))
+
+
+@composite
+def async_player_notifiers(draw) -> MockedAsyncPlayerNotifier:
+    return MockedAsyncPlayerNotifier(draw(booleans()), draw(booleans()))
@@ -1,15 +1,18 @@
+import asyncio
+
 from hypothesis import given
 from hypothesis.strategies import booleans, text
 
 from paper_tactics.entities.game import Game
-from paper_tactics.use_cases.concede import concede
+from paper_tactics.use_cases.concede import concede, concede_async
 from tests.entities.strategies import games
 from tests.use_cases.mocked_ports import (
+    MockedAsyncPlayerNotifier,
     MockedGameRepository,
     MockedLogger,
     MockedPlayerNotifier,
 )
-from tests.use_cases.strategies import player_notifiers
+from tests.use_cases.strategies import async_player_notifiers, player_notifiers
 
 
 @given(player_notifiers(), games(is_against_bot=False), booleans())
@@ -61,3 +64,32 @@ def test_conceding_in_unexisting_game_is_logged(
     concede(game_repository, player_notifier, logger, game_id, player_id)
 
     assert logger.log
+
+
+@given(async_player_notifiers(), games(is_against_bot=False), booleans())
+def test_both_players_are_notified_concurrently_when_someone_concedes(
+    player_notifier: MockedAsyncPlayerNotifier,
+    game: Game,
+    is_conceding_player_active: bool,
+):
+    game_repository = MockedGameRepository({game.id: game})
+    logger = MockedLogger()
+
+    if is_conceding_player_active:
+        conceding_player = game.active_player
+        opponent = game.passive_player
+    else:
+        conceding_player = game.passive_player
+        opponent = game.active_player
+
+    asyncio.run(
+        concede_async(
+            game_repository, player_notifier, logger, game.id, conceding_player.id
+        )
+    )
+
+    assert (
+        conceding_player.id in player_notifier.notified_player_ids
+        and opponent.id in player_notifier.notified_player_ids
+    )
+    assert conceding_player.is_gone
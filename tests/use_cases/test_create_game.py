@@ -1,15 +1,27 @@
+import asyncio
+
 from hypothesis import given
+from hypothesis.strategies import integers, lists
 
 from paper_tactics.entities.match_request import MatchRequest
-from paper_tactics.use_cases.create_game import create_game
+from paper_tactics.use_cases.create_game import (
+    create_game,
+    create_game_async,
+    create_games_async,
+)
 from tests.entities.strategies import match_requests
 from tests.use_cases.mocked_ports import (
+    MockedAsyncPlayerNotifier,
     MockedGameRepository,
     MockedLogger,
     MockedMatchRequestQueue,
     MockedPlayerNotifier,
 )
-from tests.use_cases.strategies import match_request_queues, player_notifiers
+from tests.use_cases.strategies import (
+    async_player_notifiers,
+    match_request_queues,
+    player_notifiers,
+)
 
 
 @given(match_request_queues(), player_notifiers(), match_requests(is_against_bot=False))
@@ -41,3 +53,104 @@ def test_players_are_notified_if_a_game_is_created(
 
     if game_repository.stored_games:
         assert request.id in player_notifier.notified_player_ids
+
+
+@given(
+    match_request_queues(),
+    async_player_notifiers(),
+    match_requests(is_against_bot=False),
+)
+def test_game_is_stored_with_the_gone_player_if_created_concurrently(
+    match_request_queue: MockedMatchRequestQueue,
+    player_notifier: MockedAsyncPlayerNotifier,
+    request: MatchRequest,
+):
+    game_repository = MockedGameRepository()
+    logger = MockedLogger()
+    asyncio.run(
+        create_game_async(
+            game_repository, match_request_queue, player_notifier, logger, request
+        )
+    )
+
+    for game in game_repository.stored_games.values():
+        is_someone_gone = game.active_player.is_gone or game.passive_player.is_gone
+        assert is_someone_gone == (
+            player_notifier.active_player_is_gone
+            or player_notifier.passive_player_is_gone
+        )
+        if player_notifier.active_player_is_gone:
+            assert request in match_request_queue.requests
+
+
+@given(
+    lists(match_requests(is_against_bot=False), unique_by=lambda request: request.id),
+    integers(min_value=0, max_value=10),
+)
+def test_requests_with_same_preferences_are_paired_in_bulk(requests, max_count):
+    match_request_queue = MockedMatchRequestQueue(requests)
+    game_repository = MockedGameRepository()
+    player_notifier = MockedAsyncPlayerNotifier(False, False)
+    asyncio.run(
+        create_games_async(
+            game_repository,
+            match_request_queue,
+            player_notifier,
+            MockedLogger(),
+            max_count,
+        )
+    )
+
+    paired_ids = []
+    for game in game_repository.stored_games.values():
+        players = game.active_player, game.passive_player
+        paired_ids += (player.id for player in players)
+        for player in players:
+            request = next(request for request in requests if request.id == player.id)
+            assert request.game_preferences == game.preferences
+            assert player.id in player_notifier.notified_player_ids
+    # Requests with invalid preferences are dropped
+    assert sorted(paired_ids + [r.id for r in match_request_queue.requests]) == sorted(
+        request.id
+        for request in requests
+        if request.game_preferences.valid or request in requests[max_count:]
+    )
+    leftover_preferences = [
+        request.game_preferences
+        for request in match_request_queue.requests
+        if request not in requests[max_count:]
+    ]
+    assert len(leftover_preferences) == len(set(leftover_preferences))
+
+
+@given(
+    lists(
+        match_requests(is_against_bot=False),
+        min_size=2,
+        unique_by=lambda request: request.id,
+    ),
+    async_player_notifiers(),
+)
+def test_only_players_with_opponents_here_are_paired_in_bulk(
+    requests, player_notifier: MockedAsyncPlayerNotifier
+):
+    match_request_queue = MockedMatchRequestQueue(requests)
+    game_repository = MockedGameRepository()
+    asyncio.run(
+        create_games_async(
+            game_repository, match_request_queue, player_notifier, MockedLogger()
+        )
+    )
+
+    for game in game_repository.stored_games.values():
+        assert not game.passive_player.is_gone
+        assert game.active_player.is_gone == player_notifier.active_player_is_gone
+    if player_notifier.passive_player_is_gone:
+        assert not game_repository.stored_games
+        # The active players are queued again without hearing of the games
+        assert sorted(request.id for request in match_request_queue.requests) == sorted(
+            request.id
+            for request in requests
+            if request.game_preferences.valid
+            and request.id not in player_notifier.notified_player_ids
+        )
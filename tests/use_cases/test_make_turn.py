@@ -1,15 +1,26 @@
-from hypothesis import assume, given
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+from hypothesis import assume, given, settings
 from hypothesis.strategies import data, integers, sampled_from, text, tuples
 
-from paper_tactics.entities.game import Game
-from paper_tactics.use_cases.make_turn import make_turn
+from paper_tactics.entities.cell import Cell
+from paper_tactics.entities.game import Game, IllegalTurnException
+from paper_tactics.entities.game_bot import GameBot
+from paper_tactics.entities.game_view import GameView
+from paper_tactics.use_cases.make_turn import make_turn, make_turn_async
 from tests.entities.strategies import games
 from tests.use_cases.mocked_ports import (
+    MockedAsyncPlayerNotifier,
+    MockedBehindGameRepository,
+    MockedConcurrentGameRepository,
     MockedGameRepository,
     MockedLogger,
     MockedPlayerNotifier,
 )
-from tests.use_cases.strategies import player_notifiers
+from tests.use_cases.strategies import async_player_notifiers, player_notifiers
 
 
 @given(player_notifiers(), games(), data())
@@ -91,3 +102,136 @@ def test_making_turn_in_unexistent_game_is_logged(
     make_turn(game_repository, player_notifier, logger, game_id, player_id, cell)
 
     assert logger.log
+
+
+@given(player_notifiers(), games(is_against_bot=False), data())
+def test_concurrent_concession_is_not_lost_when_a_turn_is_made(
+    player_notifier: MockedPlayerNotifier, game: Game, data
+):
+    assume(game.active_player.can_win and game.passive_player.can_win)
+    cell = data.draw(sampled_from(list(game.active_player.reachable)))
+
+    def concede(stored_game: Game) -> None:
+        stored_game.passive_player.is_gone = True
+
+    game_repository = MockedConcurrentGameRepository(game, concede)
+    logger = MockedLogger()
+
+    make_turn(
+        game_repository, player_notifier, logger, game.id, game.active_player.id, cell
+    )
+
+    assert game_repository.stored_games[game.id].passive_player.is_gone
+
+
+@given(player_notifiers(), games(is_against_bot=False), data())
+def test_turn_is_made_in_stored_game_if_fetched_game_is_behind(
+    player_notifier: MockedPlayerNotifier, game: Game, data
+):
+    assume(game.active_player.can_win and game.passive_player.can_win)
+    cell = data.draw(sampled_from(list(game.active_player.reachable)))
+    older_game = game.clone()
+    older_game.active_player, older_game.passive_player = (
+        older_game.passive_player,
+        older_game.active_player,
+    )
+    game.version = 1
+    game_repository = MockedBehindGameRepository(game, older_game)
+    logger = MockedLogger()
+
+    make_turn(
+        game_repository, player_notifier, logger, game.id, game.active_player.id, cell
+    )
+
+    assert not any(isinstance(e, IllegalTurnException) for e in logger.log)
+    assert game_repository.stored_games[game.id].version > game.version
+
+
+@given(async_player_notifiers(), games(is_against_bot=False), data())
+def test_players_are_notified_concurrently_when_a_valid_turn_is_made(
+    player_notifier: MockedAsyncPlayerNotifier, game: Game, data
+):
+    game_repository = MockedGameRepository({game.id: game})
+    logger = MockedLogger()
+    assume(game.active_player.can_win and game.passive_player.can_win)
+    cell = data.draw(sampled_from(list(game.active_player.reachable)))
+
+    asyncio.run(
+        make_turn_async(
+            game_repository,
+            player_notifier,
+            logger,
+            game.id,
+            game.active_player.id,
+            cell,
+        )
+    )
+
+    assert (
+        game.active_player.id in player_notifier.notified_player_ids
+        and game.passive_player.id in player_notifier.notified_player_ids
+    )
+    stored_game = game_repository.stored_games[game.id]
+    gone_players = [
+        player
+        for player in (stored_game.active_player, stored_game.passive_player)
+        if player.is_gone
+    ]
+    assert len(gone_players) == (
+        player_notifier.active_player_is_gone + player_notifier.passive_player_is_gone
+    )
+    if len(gone_players) == 1:
+        assert player_notifier.game_views[-1].opponent.is_gone
+
+
+@dataclass(frozen=True)
+class SlowGameBot(GameBot):
+    # Called before and after every turn the bot makes
+    on_turn: Callable[[], None] = lambda: None
+
+    def make_turn(self, game_view: GameView) -> Cell:
+        self.on_turn()
+        time.sleep(0.01)
+        self.on_turn()
+        return super().make_turn(game_view)
+
+
+@settings(max_examples=10, deadline=None)
+@given(async_player_notifiers(), games(shallow=True, is_against_bot=True), data())
+def test_other_players_are_served_while_bot_makes_a_turn(
+    player_notifier: MockedAsyncPlayerNotifier, game: Game, data
+):
+    assume(game.active_player.can_win and game.passive_player.can_win)
+    game.turns_left = 1
+    game_repository = MockedGameRepository({game.id: game.clone()})
+    logger = MockedLogger()
+    cell = data.draw(sampled_from(list(game.active_player.reachable)))
+    served_count = 0
+    served_counts_in_bot_turns = []
+
+    async def serve_others() -> None:
+        nonlocal served_count
+        while True:
+            await asyncio.sleep(0)
+            served_count += 1
+
+    async def make_turn_meanwhile() -> None:
+        serving = asyncio.create_task(serve_others())
+        await make_turn_async(
+            game_repository,
+            player_notifier,
+            logger,
+            game.id,
+            game.active_player.id,
+            cell,
+            SlowGameBot(
+                on_turn=lambda: served_counts_in_bot_turns.append(served_count)
+            ),
+        )
+        serving.cancel()
+
+    asyncio.run(make_turn_meanwhile())
+
+    # The bot has nothing to do once its units are cut off
+    assume(served_counts_in_bot_turns)
+    assert served_counts_in_bot_turns[-1] > served_counts_in_bot_turns[0]